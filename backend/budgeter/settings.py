@@ -180,6 +180,15 @@ TRANSACTION_CATEGORIES = [
     'other',
 ]
 
+# Statement ingestion: rows per idempotency lookup / bulk insert batch
+STATEMENT_IMPORT_CHUNK_SIZE = int(os.environ.get('STATEMENT_IMPORT_CHUNK_SIZE', '1000'))
+# PDF statements with at least this many pages are extracted by a pool of
+# STATEMENT_PDF_WORKERS processes; set workers to 1 to always extract serially
+STATEMENT_PDF_WORKERS = int(os.environ.get('STATEMENT_PDF_WORKERS', '4'))
+STATEMENT_PDF_PARALLEL_MIN_PAGES = int(os.environ.get('STATEMENT_PDF_PARALLEL_MIN_PAGES', '20'))
+# Recurring detection after an upload looks this far back from the upload's earliest debit
+RECURRING_HISTORY_DAYS = int(os.environ.get('RECURRING_HISTORY_DAYS', '400'))
+
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 
@@ -1,8 +1,50 @@
+from datetime import date
+from decimal import Decimal
 from django.db import models
+from django.db.models import Case, DecimalField, DateField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Least
 from django.conf import settings
 import uuid
 
 
+class BudgetQuerySet(models.QuerySet):
+    def current(self, as_of=None):
+        """Active budgets whose period includes ``as_of``, with spend up to it"""
+        as_of = as_of or date.today()
+        return self.filter(
+            is_active=True,
+            start_date__lte=as_of,
+            end_date__gte=as_of
+        ).select_related('category').with_spent(as_of=as_of)
+
+    def with_spent(self, as_of=None):
+        """Annotate ``spent_amount`` (debits from start_date to min(end_date, as_of))
+        with correlated subqueries, so ``spent`` and friends need no extra queries"""
+        from transactions.models import Transaction
+        
+        as_of = as_of or date.today()
+        debits = Transaction.objects.filter(
+            user=OuterRef('user'),
+            transaction_type='debit',
+            date__gte=OuterRef('start_date'),
+            date__lte=Least(OuterRef('end_date'), Value(as_of, output_field=DateField())),
+        ).order_by().values('user')
+        
+        def total(queryset):
+            return Subquery(queryset.annotate(total=Sum('amount')).values('total')[:1])
+        
+        return self.annotate(
+            spent_amount=Coalesce(
+                Case(
+                    When(category__isnull=True, then=total(debits)),
+                    default=total(debits.filter(category=OuterRef('category'))),
+                ),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
+
+
 class Budget(models.Model):
     PERIOD_CHOICES = [
         ('weekly', 'Weekly'),
@@ -32,6 +74,8 @@ class Budget(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BudgetQuerySet.as_manager()
+
     class Meta:
         db_table = 'budgets'
         ordering = ['-created_at']
@@ -41,9 +85,10 @@ class Budget(models.Model):
 
     @property
     def spent(self):
+        if hasattr(self, 'spent_amount'):
+            return self.spent_amount
+        
         from transactions.models import Transaction
-        from django.db.models import Sum
-        from datetime import date
         
         today = date.today()
         end = min(self.end_date, today)
@@ -1,3 +1,85 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from transactions.models import Category, Transaction
+from .models import Budget
+
+
+class BudgetQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user@example.com', password='test-pass-123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = date.today()
+        self.start = self.today.replace(day=1)
+        self.end = self.start + timedelta(days=40)
+
+    def add_budgets(self, count):
+        existing = Budget.objects.count()
+        for i in range(existing, existing + count):
+            category = Category.objects.create(name=f'Category {i}', user=self.user)
+            Budget.objects.create(
+                user=self.user, name=f'Budget {i}', category=category,
+                amount=Decimal('100.00'), start_date=self.start, end_date=self.end
+            )
+            Transaction.objects.create(
+                user=self.user, date=self.start, description=f'Purchase {i}',
+                amount=Decimal('25.00'), transaction_type='debit', category=category
+            )
+
+    def test_summary_query_count_does_not_grow_with_budgets(self):
+        self.add_budgets(1)
+        with self.assertNumQueries(1):
+            self.client.get('/api/budgets/summary/')
+        
+        self.add_budgets(4)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/budgets/summary/')
+        
+        self.assertEqual(response.data['budgets_count'], 5)
+        self.assertEqual(response.data['total_spent'], Decimal('125.00'))
+
+    def test_list_query_count_does_not_grow_with_budgets(self):
+        self.add_budgets(1)
+        with self.assertNumQueries(2):
+            self.client.get('/api/budgets/')
+        
+        self.add_budgets(4)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/budgets/')
+        
+        self.assertEqual(response.data['count'], 5)
 
-# Create your tests here.
+    def test_annotated_spent_matches_property(self):
+        food = Category.objects.create(name='Food', user=self.user)
+        other = Category.objects.create(name='Other', user=self.user)
+        Budget.objects.create(
+            user=self.user, name='Food', category=food,
+            amount=Decimal('100.00'), start_date=self.start, end_date=self.end
+        )
+        Budget.objects.create(
+            user=self.user, name='Everything',
+            amount=Decimal('500.00'), start_date=self.start, end_date=self.end
+        )
+        for amount, category, tx_date in [
+            ('10.00', food, self.start),
+            ('15.00', other, self.start),
+            ('99.00', food, self.start - timedelta(days=1)),
+            ('7.00', food, self.today + timedelta(days=1)),
+        ]:
+            Transaction.objects.create(
+                user=self.user, date=tx_date, description=f'{category.name} {amount} {tx_date}',
+                amount=Decimal(amount), transaction_type='debit', category=category
+            )
+        
+        annotated = {b.name: b.spent for b in Budget.objects.with_spent()}
+        
+        self.assertEqual(annotated, {'Food': Decimal('10.00'), 'Everything': Decimal('25.00')})
+        for budget in Budget.objects.all():
+            self.assertEqual(budget.spent, annotated[budget.name])
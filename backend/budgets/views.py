@@ -1,5 +1,4 @@
 from datetime import date
-from django.db.models import Sum
 from rest_framework import generics, status, views
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -38,7 +37,7 @@ class BudgetListCreateView(generics.ListCreateAPIView):
         if period:
             queryset = queryset.filter(period=period)
         
-        return queryset.select_related('category')
+        return queryset.select_related('category').with_spent()
 
     @extend_schema(tags=['Budgets'])
     def perform_create(self, serializer):
@@ -61,12 +60,7 @@ class BudgetSummaryView(views.APIView):
     def get(self, request):
         today = date.today()
         
-        active_budgets = Budget.objects.filter(
-            user=request.user,
-            is_active=True,
-            start_date__lte=today,
-            end_date__gte=today
-        ).select_related('category')
+        active_budgets = Budget.objects.filter(user=request.user).current(as_of=today)
         
         total_budget = sum(b.amount for b in active_budgets)
         total_spent = sum(b.spent for b in active_budgets)
@@ -136,7 +130,7 @@ class MonthlyBudgetReportView(views.APIView):
         ]
     )
     def get(self, request):
-        from transactions.models import Transaction, Category
+        from transactions.aggregation import summarize_transactions
         from calendar import monthrange
         
         today = date.today()
@@ -147,34 +141,15 @@ class MonthlyBudgetReportView(views.APIView):
         _, last_day = monthrange(year, month)
         end_date = date(year, month, last_day)
         
-        transactions = Transaction.objects.filter(
-            user=request.user,
-            date__gte=start_date,
-            date__lte=end_date
-        )
-        
-        income = transactions.filter(
-            transaction_type='credit'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        expenses = transactions.filter(
-            transaction_type='debit'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        by_category = transactions.filter(
-            transaction_type='debit',
-            category__isnull=False
-        ).values(
-            'category__id', 'category__name', 'category__color'
-        ).annotate(
-            total=Sum('amount')
-        ).order_by('-total')
+        summary = summarize_transactions(request.user, start_date, end_date)
+        income = summary['income']
+        expenses = summary['expenses']
         
         budgets = Budget.objects.filter(
             user=request.user,
             start_date__lte=end_date,
             end_date__gte=start_date
-        ).select_related('category')
+        ).select_related('category').with_spent()
         
         budget_data = []
         for budget in budgets:
@@ -200,6 +175,6 @@ class MonthlyBudgetReportView(views.APIView):
                 'expenses': expenses,
                 'net': income - expenses
             },
-            'by_category': list(by_category),
+            'by_category': summary['by_category'],
             'budgets': budget_data
         })
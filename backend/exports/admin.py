@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import ExportJob
 
-# Register your models here.
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['export_type', 'user', 'status', 'progress', 'created_at', 'completed_at']
+    list_filter = ['export_type', 'status', 'created_at']
+    raw_id_fields = ['user']
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:10
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('export_type', models.CharField(choices=[('transactions_csv', 'Transactions CSV'), ('transactions_excel', 'Transactions Excel'), ('budget_report_pdf', 'Budget Report PDF'), ('category_summary', 'Category Summary')], max_length=30)),
+                ('parameters', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('file', models.FileField(blank=True, null=True, upload_to='exports/')),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'export_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='export_jobs_user_id_e522fa_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='export_type',
+            field=models.CharField(choices=[('transactions_csv', 'Transactions CSV'), ('transactions_excel', 'Transactions Excel'), ('transactions_parquet', 'Transactions Parquet'), ('transactions_arrow', 'Transactions Arrow IPC'), ('budget_report_pdf', 'Budget Report PDF'), ('category_summary', 'Category Summary')], max_length=30),
+        ),
+    ]
@@ -1,3 +1,48 @@
 from django.db import models
+from django.conf import settings
+import uuid
 
-# Create your models here.
+
+class ExportJob(models.Model):
+    EXPORT_TYPES = [
+        ('transactions_csv', 'Transactions CSV'),
+        ('transactions_excel', 'Transactions Excel'),
+        ('transactions_parquet', 'Transactions Parquet'),
+        ('transactions_arrow', 'Transactions Arrow IPC'),
+        ('budget_report_pdf', 'Budget Report PDF'),
+        ('category_summary', 'Category Summary'),
+        ('category_pivot', 'Category Pivot'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='export_jobs'
+    )
+    export_type = models.CharField(max_length=30, choices=EXPORT_TYPES)
+    parameters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveSmallIntegerField(default=0)
+    file = models.FileField(upload_to='exports/', blank=True, null=True)
+    filename = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'export_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.export_type} - {self.status}"
@@ -0,0 +1,644 @@
+"""Export renderers shared by the synchronous export views and export jobs.
+
+Each writer renders into a binary file-like ``output``.
+"""
+import csv
+import hashlib
+import io
+import json
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from itertools import chain, islice
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+
+from transactions.models import Category, Transaction
+from transactions.aggregation import summarize_transactions
+from budgets.models import Budget
+
+
+TRANSACTION_EXPORT_HEADERS = ['Date', 'Description', 'Amount', 'Type', 'Category', 'Notes', 'Is Recurring']
+EXPORT_CHUNK_SIZE = 2000
+
+
+def filter_export_transactions(user, params):
+    """Transactions for an export, narrowed by the start_date/end_date/category query params"""
+    queryset = Transaction.objects.filter(user=user)
+    
+    if params.get('start_date'):
+        queryset = queryset.filter(date__gte=params['start_date'])
+    if params.get('end_date'):
+        queryset = queryset.filter(date__lte=params['end_date'])
+    if params.get('category'):
+        queryset = queryset.filter(category_id=params['category'])
+    
+    return queryset
+
+
+def export_rows(queryset):
+    """Export rows of ``queryset`` as tuples, newest first, with the category name joined in SQL"""
+    return queryset.order_by('-date', '-created_at').values_list(
+        'date', 'description', 'amount', 'transaction_type',
+        'category__name', 'notes', 'is_recurring'
+    )
+
+
+def iter_export_rows(queryset, progress=None):
+    """Stream ``export_rows(queryset)``.
+    
+    ``progress`` is called with the number of rows read after every chunk.
+    """
+    rows = export_rows(queryset).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    
+    if progress is None:
+        return rows
+    return _report_progress(rows, progress)
+
+
+def _report_progress(rows, progress):
+    count = 0
+    for count, row in enumerate(rows, 1):
+        yield row
+        if count % EXPORT_CHUNK_SIZE == 0:
+            progress(count)
+    progress(count)
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer into a generator"""
+
+    def write(self, value):
+        return value
+
+
+def stream_transactions_csv(queryset, progress=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(TRANSACTION_EXPORT_HEADERS)
+    
+    for tx_date, description, amount, tx_type, category_name, notes, is_recurring in iter_export_rows(queryset, progress):
+        yield writer.writerow([
+            tx_date.isoformat(),
+            description,
+            str(amount),
+            tx_type,
+            category_name or '',
+            notes,
+            'Yes' if is_recurring else 'No'
+        ])
+
+
+def write_transactions_csv(queryset, output, progress=None):
+    """Write the CSV export to a binary file"""
+    for line in stream_transactions_csv(queryset, progress):
+        output.write(line.encode('utf-8'))
+    return output
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# Rows used to estimate column widths, which write-only sheets need before any row is written
+EXCEL_WIDTH_SAMPLE_ROWS = 500
+# Spooled exports stay in memory up to this size, then move to a temp file on disk
+EXPORT_SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+
+def write_transactions_xlsx(queryset, output, progress=None):
+    """Write transactions to ``output`` with a write-only workbook, streaming rows from the database"""
+    rows = (
+        [
+            tx_date.isoformat(),
+            description,
+            float(amount),
+            tx_type,
+            category_name or '',
+            notes,
+            'Yes' if is_recurring else 'No'
+        ]
+        for tx_date, description, amount, tx_type, category_name, notes, is_recurring in iter_export_rows(queryset, progress)
+    )
+    sample = list(islice(rows, EXCEL_WIDTH_SAMPLE_ROWS))
+    
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Transactions")
+    
+    for index, header in enumerate(TRANSACTION_EXPORT_HEADERS):
+        max_length = max([len(header)] + [len(str(row[index])) for row in sample])
+        ws.column_dimensions[get_column_letter(index + 1)].width = min(max_length + 2, 50)
+    
+    header_row = []
+    for header in TRANSACTION_EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = Font(bold=True)
+        header_row.append(cell)
+    ws.append(header_row)
+    
+    for row in chain(sample, rows):
+        ws.append(row)
+    
+    wb.save(output)
+    return output
+
+
+COLUMNAR_CONTENT_TYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+TRANSACTION_TYPES = ['credit', 'debit']
+
+
+def transaction_arrow_schema():
+    import pyarrow as pa
+    
+    return pa.schema([
+        ('date', pa.date32()),
+        ('description', pa.string()),
+        ('amount', pa.decimal128(12, 2)),
+        ('type', pa.dictionary(pa.int32(), pa.string())),
+        ('category', pa.dictionary(pa.int32(), pa.string())),
+        ('notes', pa.string()),
+        ('is_recurring', pa.bool_()),
+    ])
+
+
+def write_transactions_columnar(queryset, output, file_format='parquet', progress=None):
+    """Write transactions as zstd-compressed Parquet or Arrow IPC, one record batch per chunk.
+    
+    Category and type are dictionary-encoded against dictionaries fixed up
+    front, so every batch shares them (the IPC file format cannot replace a
+    dictionary between batches).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = transaction_arrow_schema()
+    categories = sorted(
+        queryset.order_by().exclude(category=None).values_list('category__name', flat=True).distinct()
+    )
+    category_index = {name: index for index, name in enumerate(categories)}
+    type_index = {name: index for index, name in enumerate(TRANSACTION_TYPES)}
+    category_dictionary = pa.array(categories, pa.string())
+    type_dictionary = pa.array(TRANSACTION_TYPES, pa.string())
+    
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(output, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(output, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+    
+    rows = iter_export_rows(queryset, progress)
+    with writer:
+        while True:
+            chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            
+            dates, descriptions, amounts, tx_types, category_names, notes, recurring = zip(*chunk)
+            writer.write_batch(pa.record_batch([
+                pa.array(dates, pa.date32()),
+                pa.array(descriptions, pa.string()),
+                pa.array(amounts, pa.decimal128(12, 2)),
+                pa.DictionaryArray.from_arrays(
+                    pa.array([type_index[t] for t in tx_types], pa.int32()), type_dictionary
+                ),
+                pa.DictionaryArray.from_arrays(
+                    pa.array([category_index.get(name) for name in category_names], pa.int32()),
+                    category_dictionary
+                ),
+                pa.array(notes, pa.string()),
+                pa.array(recurring, pa.bool_()),
+            ], schema=schema))
+    
+    return output
+
+
+BUDGET_REPORT_CACHE_DIR = 'exports/cache/budget_reports'
+# Part of the cache fingerprint; bump it when the PDF layout changes
+BUDGET_REPORT_LAYOUT_VERSION = 2
+
+
+def report_period(params):
+    """(year, month, start_date, end_date) for the year/month params, defaulting to this month"""
+    today = date.today()
+    year = int(params.get('year', today.year))
+    month = int(params.get('month', today.month))
+    
+    _, last_day = monthrange(year, month)
+    return year, month, date(year, month, 1), date(year, month, last_day)
+
+
+def budget_report_data(user, params):
+    """Everything the budget report PDF shows, as plain values"""
+    year, month, start_date, end_date = report_period(params)
+    
+    summary = summarize_transactions(user, start_date, end_date)
+    
+    budgets = Budget.objects.filter(
+        user=user,
+        start_date__lte=end_date,
+        end_date__gte=start_date
+    ).with_spent()
+    
+    return {
+        'year': year,
+        'month': month,
+        'start_date': start_date,
+        # Part of the data so the cached PDF never shows a stale date
+        'as_of': min(end_date, date.today()),
+        'income': summary['income'],
+        'expenses': summary['expenses'],
+        'by_category': summary['by_category'],
+        'budgets': [
+            {
+                'name': budget.name,
+                'amount': budget.amount,
+                'spent': budget.spent,
+                'remaining': budget.remaining,
+                'percentage_used': budget.percentage_used,
+            }
+            for budget in budgets
+        ],
+    }
+
+
+def write_budget_report_pdf(user, params, output, data=None):
+    """Render the monthly budget report PDF"""
+    if data is None:
+        data = budget_report_data(user, params)
+    start_date = data['start_date']
+    income = data['income']
+    expenses = data['expenses']
+    by_category = data['by_category']
+    budgets = data['budgets']
+    
+    doc = SimpleDocTemplate(output, pagesize=letter, topMargin=0.5*inch)
+    elements = []
+    
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=20
+    )
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=10,
+        spaceBefore=15
+    )
+    
+    month_name = start_date.strftime('%B %Y')
+    elements.append(Paragraph(f"Budget Report - {month_name}", title_style))
+    
+    elements.append(Paragraph("Summary", heading_style))
+    summary_data = [
+        ['Metric', 'Amount'],
+        ['Total Income', f'${income:,.2f}'],
+        ['Total Expenses', f'${expenses:,.2f}'],
+        ['Net', f'${(income - expenses):,.2f}'],
+    ]
+    summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    elements.append(summary_table)
+    
+    if by_category:
+        elements.append(Paragraph("Spending by Category", heading_style))
+        category_data = [['Category', 'Amount', '% of Total']]
+        for cat in by_category:
+            pct = (cat['total'] / expenses * 100) if expenses > 0 else 0
+            category_data.append([
+                cat['category__name'],
+                f"${cat['total']:,.2f}",
+                f"{pct:.1f}%"
+            ])
+        
+        cat_table = Table(category_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
+        cat_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ]))
+        elements.append(cat_table)
+    
+    if budgets:
+        elements.append(Paragraph("Budget Status", heading_style))
+        budget_data = [['Budget', 'Limit', 'Spent', 'Remaining', 'Status']]
+        for budget in budgets:
+            pct = budget['percentage_used']
+            status_text = 'On Track' if pct < 80 else ('Warning' if pct < 100 else 'Exceeded')
+            budget_data.append([
+                budget['name'],
+                f"${budget['amount']:,.2f}",
+                f"${budget['spent']:,.2f}",
+                f"${budget['remaining']:,.2f}",
+                status_text
+            ])
+        
+        budget_table = Table(budget_data, colWidths=[1.8*inch, 1.2*inch, 1.2*inch, 1.2*inch, 1*inch])
+        budget_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        elements.append(budget_table)
+    
+    elements.append(Spacer(1, 20))
+    elements.append(Paragraph(
+        f"Data as of {data['as_of'].strftime('%B %d, %Y')}",
+        styles['Normal']
+    ))
+    
+    doc.build(elements)
+    return output
+
+
+def budget_report_fingerprint(data):
+    """Content hash of a report's data; equal data renders an equivalent PDF"""
+    payload = json.dumps(
+        {'layout': BUDGET_REPORT_LAYOUT_VERSION, **data}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def open_budget_report(user, params, data, fingerprint):
+    """Return a readable file of the user's report for data, rendering it if needed.
+    
+    Reports are stored under their data fingerprint, so a PDF is only
+    rendered when the numbers behind it change; older renders of the same
+    period are removed. A concurrent request rendering newer data may
+    remove this render in turn, so a fresh render is served from memory.
+    """
+    directory = f'{BUDGET_REPORT_CACHE_DIR}/{user.id}'
+    prefix = f"{data['year']}-{data['month']:02d}-"
+    name = f'{directory}/{prefix}{fingerprint}.pdf'
+    
+    try:
+        return default_storage.open(name, 'rb')
+    except FileNotFoundError:
+        pass
+    
+    buffer = write_budget_report_pdf(user, params, io.BytesIO(), data)
+    saved = default_storage.save(name, ContentFile(buffer.getvalue()))
+    if saved != name:
+        # A concurrent request stored the same report first
+        default_storage.delete(saved)
+    
+    _, files = default_storage.listdir(directory)
+    for filename in files:
+        if filename.startswith(prefix) and f'{directory}/{filename}' != name:
+            default_storage.delete(f'{directory}/{filename}')
+    
+    buffer.seek(0)
+    return buffer
+
+
+def category_summary_rows(user, params):
+    queryset = Transaction.objects.filter(
+        user=user,
+        transaction_type='debit',
+        category__isnull=False
+    )
+    
+    if params.get('start_date'):
+        queryset = queryset.filter(date__gte=params['start_date'])
+    if params.get('end_date'):
+        queryset = queryset.filter(date__lte=params['end_date'])
+    
+    return queryset.values(
+        'category__name'
+    ).annotate(
+        total=Sum('amount'),
+        count=Count('id')
+    ).order_by('-total')
+
+
+def write_category_summary(user, params, output):
+    """Render the per-category spending summary as CSV, or xlsx when params['format'] is 'excel'"""
+    summary = category_summary_rows(user, params)
+    
+    if params.get('format') == 'excel':
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Category Summary"
+        
+        ws.append(['Category', 'Total Amount', 'Transaction Count'])
+        for cell in ws[1]:
+            cell.font = cell.font.copy(bold=True)
+        
+        for row in summary:
+            ws.append([row['category__name'], float(row['total']), row['count']])
+        
+        wb.save(output)
+    else:
+        writer = csv.writer(Echo())
+        output.write(writer.writerow(['Category', 'Total Amount', 'Transaction Count']).encode('utf-8'))
+        for row in summary:
+            output.write(writer.writerow([row['category__name'], str(row['total']), row['count']]).encode('utf-8'))
+    
+    return output
+
+
+CATEGORY_PIVOT_SQL = """
+    SELECT
+        DATE_TRUNC('month', t.date)::date AS month,
+        c.name AS category,
+        COALESCE(SUM(t.amount), 0) AS total,
+        GROUPING(DATE_TRUNC('month', t.date), c.name) AS grouping_id
+    FROM {transactions} t
+    INNER JOIN {categories} c ON c.id = t.category_id
+    WHERE {where}
+    GROUP BY GROUPING SETS (
+        (DATE_TRUNC('month', t.date), c.name),
+        (DATE_TRUNC('month', t.date)),
+        (c.name),
+        ()
+    )
+"""
+
+
+def category_pivot_cells(user, params):
+    """Debit totals by (month, category) with per-month, per-category and grand totals.
+    
+    Returns (month, category, total) tuples; month and/or category is None on
+    the total rows. On PostgreSQL this is a single GROUPING SETS query.
+    """
+    if connection.vendor != 'postgresql':
+        return _category_pivot_cells_fallback(user, params)
+    
+    where = ["t.user_id = %s", "t.transaction_type = 'debit'"]
+    sql_params = [user.pk]
+    if params.get('start_date'):
+        where.append('t.date >= %s')
+        sql_params.append(params['start_date'])
+    if params.get('end_date'):
+        where.append('t.date <= %s')
+        sql_params.append(params['end_date'])
+    
+    sql = CATEGORY_PIVOT_SQL.format(
+        transactions=Transaction._meta.db_table,
+        categories=Category._meta.db_table,
+        where=' AND '.join(where),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, sql_params)
+        # GROUPING() sets bit 1 when month is rolled up and bit 0 for category
+        return [
+            (
+                None if grouping_id & 2 else month,
+                None if grouping_id & 1 else category,
+                total,
+            )
+            for month, category, total, grouping_id in cursor.fetchall()
+        ]
+
+
+def _category_pivot_cells_fallback(user, params):
+    """Same cells for backends without GROUPING SETS: one grouped query, totals summed here"""
+    queryset = Transaction.objects.filter(
+        user=user,
+        transaction_type='debit',
+        category__isnull=False
+    )
+    if params.get('start_date'):
+        queryset = queryset.filter(date__gte=params['start_date'])
+    if params.get('end_date'):
+        queryset = queryset.filter(date__lte=params['end_date'])
+    
+    leaves = queryset.values_list(
+        TruncMonth('date'), 'category__name'
+    ).annotate(total=Sum('amount')).order_by()
+    
+    subtotals = defaultdict(Decimal)
+    cells = []
+    for month, category, total in leaves:
+        cells.append((month, category, total))
+        subtotals[(month, None)] += total
+        subtotals[(None, category)] += total
+        subtotals[(None, None)] += total
+    
+    return cells + [(month, category, total) for (month, category), total in subtotals.items()]
+
+
+def build_category_pivot(cells):
+    """Arrange pivot cells into a category x month table.
+    
+    Returns (months, rows, month_totals, grand_total) where rows are
+    (category, [total per month], category total), largest first.
+    """
+    months = sorted({month for month, category, _ in cells if month is not None})
+    values = {(month, category): total for month, category, total in cells}
+    categories = sorted(
+        {category for month, category, _ in cells if category is not None},
+        key=lambda category: (-values[(None, category)], category)
+    )
+    
+    rows = [
+        (
+            category,
+            [values.get((month, category), Decimal('0')) for month in months],
+            values[(None, category)],
+        )
+        for category in categories
+    ]
+    month_totals = [values[(month, None)] for month in months]
+    # The () grouping set still yields a grand total row when nothing matched
+    return months, rows, month_totals, values.get((None, None)) or Decimal('0')
+
+
+def write_category_pivot(user, params, output):
+    """Render the month x category pivot as CSV, or xlsx when params['file_type'] is 'excel'"""
+    months, rows, month_totals, grand_total = build_category_pivot(category_pivot_cells(user, params))
+    
+    header = ['Category'] + [month.strftime('%Y-%m') for month in months] + ['Total']
+    table = [[category] + totals + [total] for category, totals, total in rows]
+    footer = ['Total'] + month_totals + [grand_total]
+    
+    if params.get('file_type') == 'excel':
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Category Pivot"
+        
+        ws.append(header)
+        for row in table:
+            ws.append([row[0]] + [float(value) for value in row[1:]])
+        ws.append([footer[0]] + [float(value) for value in footer[1:]])
+        
+        for cell in chain(ws[1], ws[ws.max_row]):
+            cell.font = cell.font.copy(bold=True)
+        
+        wb.save(output)
+    else:
+        writer = csv.writer(Echo())
+        for row in chain([header], table, [footer]):
+            output.write(writer.writerow([str(value) for value in row]).encode('utf-8'))
+    
+    return output
+
+
+def _filename(prefix, extension):
+    return f'{prefix}_{date.today()}.{extension}'
+
+
+def render_export(export_type, user, params, output, progress=None):
+    """Render an export into ``output``; returns (filename, content_type)"""
+    if export_type == 'transactions_csv':
+        write_transactions_csv(filter_export_transactions(user, params), output, progress)
+        return _filename('transactions', 'csv'), 'text/csv'
+    
+    if export_type == 'transactions_excel':
+        write_transactions_xlsx(filter_export_transactions(user, params), output, progress)
+        return _filename('transactions', 'xlsx'), XLSX_CONTENT_TYPE
+    
+    if export_type in ('transactions_parquet', 'transactions_arrow'):
+        file_format = export_type.split('_', 1)[1]
+        write_transactions_columnar(filter_export_transactions(user, params), output, file_format, progress)
+        return _filename('transactions', file_format), COLUMNAR_CONTENT_TYPES[file_format]
+    
+    if export_type == 'budget_report_pdf':
+        year, month, _, _ = report_period(params)
+        write_budget_report_pdf(user, params, output)
+        return f'budget_report_{year}_{month:02d}.pdf', 'application/pdf'
+    
+    if export_type == 'category_summary':
+        write_category_summary(user, params, output)
+        if params.get('format') == 'excel':
+            return _filename('category_summary', 'xlsx'), XLSX_CONTENT_TYPE
+        return _filename('category_summary', 'csv'), 'text/csv'
+    
+    if export_type == 'category_pivot':
+        write_category_pivot(user, params, output)
+        if params.get('file_type') == 'excel':
+            return _filename('category_pivot', 'xlsx'), XLSX_CONTENT_TYPE
+        return _filename('category_pivot', 'csv'), 'text/csv'
+    
+    raise ValueError(f'Unsupported export type: {export_type}')
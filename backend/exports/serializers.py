@@ -0,0 +1,28 @@
+from django.urls import reverse
+from rest_framework import serializers
+from .models import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'export_type', 'parameters', 'status', 'progress',
+            'filename', 'download_url', 'error_message', 'created_at', 'completed_at'
+        ]
+        read_only_fields = [
+            'id', 'status', 'progress', 'filename', 'error_message',
+            'created_at', 'completed_at'
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != 'completed':
+            return None
+        return reverse('export_job_download', kwargs={'pk': obj.pk})
+
+    def validate_parameters(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('parameters must be an object')
+        return value
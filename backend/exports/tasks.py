@@ -0,0 +1,75 @@
+import tempfile
+from celery import shared_task
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.urls import reverse
+from django.utils import timezone
+
+from .renderers import EXPORT_SPOOL_MAX_SIZE, filter_export_transactions, render_export
+
+# Bad parameters (an unparseable date, an unknown export type or format)
+# fail the same way on every attempt, so they are not retried
+PERMANENT_EXPORT_ERRORS = (ValueError, TypeError, KeyError, ValidationError)
+
+
+@shared_task(bind=True, max_retries=3)
+def generate_export(self, job_id):
+    """Render an ExportJob's artifact to default storage and notify the user"""
+    from .models import ExportJob
+    from notifications.models import Notification
+    
+    job = ExportJob.objects.select_related('user').get(id=job_id)
+    
+    try:
+        job.status = 'processing'
+        job.progress = 0
+        job.save(update_fields=['status', 'progress'])
+        
+        progress = None
+        if job.export_type.startswith('transactions_'):
+            total = filter_export_transactions(job.user, job.parameters).count()
+            
+            def progress(rows_done):
+                # Rendering is most of the work; the last 10% covers storing the file
+                percent = int(rows_done * 90 / total) if total else 90
+                ExportJob.objects.filter(pk=job.pk).update(progress=percent)
+        
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output:
+            filename, content_type = render_export(
+                job.export_type, job.user, job.parameters, output, progress
+            )
+            output.seek(0)
+            job.file.save(f'{job.id}/{filename}', File(output), save=False)
+        
+        job.filename = filename
+        job.content_type = content_type
+        job.status = 'completed'
+        job.progress = 100
+        job.completed_at = timezone.now()
+        job.save()
+        
+        download_url = reverse('export_job_download', kwargs={'pk': job.pk})
+        Notification.objects.create(
+            user=job.user,
+            notification_type='export_ready',
+            title='Export Ready',
+            message=f'Your export "{filename}" is ready to download.',
+            metadata={
+                'export_job_id': str(job.id),
+                'export_type': job.export_type,
+                'download_url': download_url
+            }
+        )
+        
+        return {'status': 'success', 'filename': filename}
+        
+    except Exception as e:
+        if job.file:
+            # Stored before a later step failed; the next attempt renders it again
+            job.file.delete(save=False)
+        job.status = 'failed'
+        job.error_message = str(e)
+        job.save(update_fields=['status', 'error_message', 'file'])
+        if isinstance(e, PERMANENT_EXPORT_ERRORS):
+            return {'status': 'failed', 'error': str(e)}
+        raise self.retry(exc=e, countdown=60)
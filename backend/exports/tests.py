@@ -1,3 +1,405 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from openpyxl import load_workbook
+
+from accounts.models import User
+from notifications.models import Notification
+from transactions.models import Category, Transaction
+from .models import ExportJob
+from .renderers import (
+    TRANSACTION_EXPORT_HEADERS, budget_report_data, budget_report_fingerprint, build_category_pivot,
+    transaction_arrow_schema, write_category_pivot, write_transactions_columnar
+)
+from .tasks import generate_export
+
+
+class BuildCategoryPivotTests(TestCase):
+    def test_arranges_cells_largest_category_first(self):
+        jan, feb = date(2024, 1, 1), date(2024, 2, 1)
+        cells = [
+            (jan, 'Food', Decimal('10')), (feb, 'Food', Decimal('5')),
+            (feb, 'Rent', Decimal('900')),
+            (jan, None, Decimal('10')), (feb, None, Decimal('905')),
+            (None, 'Food', Decimal('15')), (None, 'Rent', Decimal('900')),
+            (None, None, Decimal('915')),
+        ]
+        
+        months, rows, month_totals, grand_total = build_category_pivot(cells)
+        
+        self.assertEqual(months, [jan, feb])
+        self.assertEqual(rows, [
+            ('Rent', [Decimal('0'), Decimal('900')], Decimal('900')),
+            ('Food', [Decimal('10'), Decimal('5')], Decimal('15')),
+        ])
+        self.assertEqual(month_totals, [Decimal('10'), Decimal('905')])
+        self.assertEqual(grand_total, Decimal('915'))
+
+    def test_empty_grand_total_row_is_zero(self):
+        for cells in ([], [(None, None, None)]):
+            with self.subTest(cells=cells):
+                self.assertEqual(build_category_pivot(cells), ([], [], [], Decimal('0')))
+
+
+class WriteCategoryPivotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user@example.com', password='test-pass-123'
+        )
+
+    def add_debit(self, tx_date, amount, category):
+        Transaction.objects.create(
+            user=self.user, date=tx_date, description=f'{category.name} {tx_date}',
+            amount=Decimal(amount), transaction_type='debit', category=category
+        )
+
+    def csv_rows(self, params):
+        output = write_category_pivot(self.user, params, io.BytesIO())
+        return list(csv.reader(io.StringIO(output.getvalue().decode('utf-8'))))
+
+    def test_csv_pivot(self):
+        food = Category.objects.create(name='Food', user=self.user)
+        self.add_debit(date(2024, 1, 3), '12.50', food)
+        self.add_debit(date(2024, 2, 3), '7.50', food)
+        
+        header, *rows = self.csv_rows({})
+        
+        self.assertEqual(header, ['Category', '2024-01', '2024-02', 'Total'])
+        self.assertEqual(
+            [[label] + [Decimal(value) for value in values] for label, *values in rows],
+            [
+                ['Food', Decimal('12.50'), Decimal('7.50'), Decimal('20.00')],
+                ['Total', Decimal('12.50'), Decimal('7.50'), Decimal('20.00')],
+            ]
+        )
+
+    def test_csv_pivot_without_transactions(self):
+        self.assertEqual(self.csv_rows({}), [['Category', 'Total'], ['Total', '0']])
+
+    def test_excel_pivot_without_transactions(self):
+        output = write_category_pivot(self.user, {'file_type': 'excel'}, io.BytesIO())
+        
+        output.seek(0)
+        ws = load_workbook(output).active
+        self.assertEqual(
+            [list(row) for row in ws.iter_rows(values_only=True)],
+            [['Category', 'Total'], ['Total', 0]]
+        )
+
+
+class BudgetReportFingerprintTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user@example.com', password='test-pass-123'
+        )
+
+    def test_past_month_report_is_dated_by_its_last_day(self):
+        data = budget_report_data(self.user, {'year': '2024', 'month': '2'})
+        
+        self.assertEqual(data['as_of'], date(2024, 2, 29))
+
+    def test_fingerprint_covers_the_date_shown_in_the_report(self):
+        data = budget_report_data(self.user, {'year': '2024', 'month': '2'})
+        
+        self.assertEqual(budget_report_fingerprint(data), budget_report_fingerprint(dict(data)))
+        self.assertNotEqual(
+            budget_report_fingerprint(data),
+            budget_report_fingerprint({**data, 'as_of': date(2024, 2, 28)})
+        )
+
+
+class WriteTransactionsColumnarTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user@example.com', password='test-pass-123'
+        )
+        food = Category.objects.create(name='Food', user=self.user)
+        rows = [
+            (date(2024, 1, 3), '12.50', 'debit', food, True),
+            (date(2024, 1, 2), '1000.00', 'credit', None, False),
+            (date(2024, 1, 1), '7.25', 'debit', food, False),
+        ]
+        for tx_date, amount, tx_type, category, is_recurring in rows:
+            Transaction.objects.create(
+                user=self.user, date=tx_date, description=f'TX {tx_date}', amount=Decimal(amount),
+                transaction_type=tx_type, category=category, is_recurring=is_recurring
+            )
+
+    def write(self, file_format, queryset=None):
+        if queryset is None:
+            queryset = Transaction.objects.filter(user=self.user)
+        # Two rows per batch, so three transactions span two batches
+        with mock.patch('exports.renderers.EXPORT_CHUNK_SIZE', 2):
+            output = write_transactions_columnar(queryset, io.BytesIO(), file_format)
+        output.seek(0)
+        return output
+
+    def read_arrow(self):
+        reader = pa.ipc.open_file(self.write('arrow'))
+        self.assertEqual(reader.num_record_batches, 2)
+        return reader.read_all()
+
+    def read_parquet(self):
+        parquet_file = pq.ParquetFile(self.write('parquet'))
+        self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+        return parquet_file.read()
+
+    def test_round_trips_typed_columns(self):
+        for file_format, read in (('arrow', self.read_arrow), ('parquet', self.read_parquet)):
+            with self.subTest(file_format=file_format):
+                table = read()
+                
+                self.assertEqual(table.schema.field('date').type, pa.date32())
+                self.assertEqual(table.schema.field('amount').type, pa.decimal128(12, 2))
+                self.assertEqual(table.schema.field('is_recurring').type, pa.bool_())
+                self.assertEqual(table.column('date').to_pylist(), [
+                    date(2024, 1, 3), date(2024, 1, 2), date(2024, 1, 1)
+                ])
+                self.assertEqual(table.column('amount').to_pylist(), [
+                    Decimal('12.50'), Decimal('1000.00'), Decimal('7.25')
+                ])
+                self.assertEqual(table.column('is_recurring').to_pylist(), [True, False, False])
+
+    def test_dictionary_columns_decode_with_null_category(self):
+        for file_format, read in (('arrow', self.read_arrow), ('parquet', self.read_parquet)):
+            with self.subTest(file_format=file_format):
+                table = read()
+                
+                self.assertTrue(pa.types.is_dictionary(table.schema.field('type').type))
+                self.assertTrue(pa.types.is_dictionary(table.schema.field('category').type))
+                self.assertEqual(table.column('type').to_pylist(), ['debit', 'credit', 'debit'])
+                self.assertEqual(table.column('category').to_pylist(), ['Food', None, 'Food'])
+
+    def test_empty_export_is_readable_with_schema(self):
+        empty = Transaction.objects.none()
+        
+        arrow = pa.ipc.open_file(self.write('arrow', empty)).read_all()
+        parquet = pq.read_table(self.write('parquet', empty))
+        
+        for table in (arrow, parquet):
+            self.assertEqual(table.num_rows, 0)
+            self.assertEqual(table.schema.names, transaction_arrow_schema().names)
+        self.assertTrue(arrow.schema.equals(transaction_arrow_schema()))
+
+
+class ExportJobTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user@example.com', password='test-pass-123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Transaction.objects.create(
+            user=self.user, date=date(2024, 1, 3), description='COFFEE SHOP',
+            amount=Decimal('4.50'), transaction_type='debit'
+        )
+
+    def create_job(self, **parameters):
+        return ExportJob.objects.create(
+            user=self.user, export_type='transactions_csv', parameters=parameters
+        )
+
+    @mock.patch('exports.views.generate_export.delay')
+    def test_create_returns_202_and_queues_the_job(self, delay):
+        response = self.client.post(
+            '/api/exports/jobs/', {'export_type': 'transactions_csv', 'parameters': {}}, format='json'
+        )
+        
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        delay.assert_called_once_with(response.data['id'])
+
+    def test_completed_job_stores_file_and_notifies(self):
+        job = self.create_job()
+        
+        generate_export.run(str(job.id))
+        
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress), ('completed', 100))
+        self.assertTrue(os.path.exists(job.file.path))
+        
+        download_url = f'/api/exports/jobs/{job.id}/download/'
+        notification = Notification.objects.get(user=self.user, notification_type='export_ready')
+        self.assertEqual(notification.metadata['download_url'], download_url)
+        
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'COFFEE SHOP', b''.join(response.streaming_content))
+
+    def test_download_is_409_while_pending(self):
+        job = self.create_job()
+        
+        response = self.client.get(f'/api/exports/jobs/{job.id}/download/')
+        
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['status'], 'pending')
+
+    def test_delete_removes_stored_file(self):
+        job = self.create_job()
+        generate_export.run(str(job.id))
+        job.refresh_from_db()
+        path = job.file.path
+        
+        response = self.client.delete(f'/api/exports/jobs/{job.id}/')
+        
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(ExportJob.objects.filter(pk=job.pk).exists())
+
+    def test_bad_parameters_fail_without_retrying(self):
+        job = self.create_job(start_date='not-a-date')
+        
+        with mock.patch.object(generate_export, 'retry') as retry:
+            result = generate_export.run(str(job.id))
+        
+        retry.assert_not_called()
+        self.assertEqual(result['status'], 'failed')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(job.error_message)
+
+    def test_failure_after_storing_removes_the_file(self):
+        job = self.create_job()
+        
+        with mock.patch.object(Notification.objects, 'create', side_effect=OSError('broker down')):
+            with self.assertRaises(OSError):
+                generate_export.run(str(job.id))
+        
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertFalse(job.file)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'exports', str(job.id))), [])
+
+
+
+class ExportBudgetReportPDFViewTests(TestCase):
+    url = '/api/exports/budget-report/pdf/?year=2024&month=1'
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user@example.com', password='test-pass-123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.transaction = Transaction.objects.create(
+            user=self.user, date=date(2024, 1, 3), description='COFFEE SHOP',
+            amount=Decimal('4.50'), transaction_type='debit'
+        )
+
+    def test_matching_etag_is_answered_before_rendering(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        
+        with mock.patch('exports.views.open_budget_report') as open_report:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        open_report.assert_not_called()
+        
+        self.transaction.amount = Decimal('5.00')
+        self.transaction.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_render_removed_by_another_request_is_rendered_again(self):
+        self.client.get(self.url)
+        shutil.rmtree(os.path.join(self.media_root, 'exports'))
+        
+        response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+
+class ExportTransactionsViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user@example.com', password='test-pass-123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        food = Category.objects.create(name='Food', user=self.user)
+        rows = [
+            (date(2024, 1, 2), 'PAYROLL', '1000.00', 'credit', None, '', False),
+            (date(2024, 1, 3), 'COFFEE, TO GO', '4.50', 'debit', food, 'Team "offsite"', True),
+            (date(2024, 1, 3), 'GROCERY STORE', '20.00', 'debit', food, '', False),
+        ]
+        for tx_date, description, amount, tx_type, category, notes, is_recurring in rows:
+            Transaction.objects.create(
+                user=self.user, date=tx_date, description=description, amount=Decimal(amount),
+                transaction_type=tx_type, category=category, notes=notes, is_recurring=is_recurring
+            )
+        other = User.objects.create_user(
+            email='other@example.com', username='other@example.com', password='test-pass-123'
+        )
+        Transaction.objects.create(
+            user=other, date=date(2024, 1, 4), description='OTHER', amount=Decimal('1.00'),
+            transaction_type='debit'
+        )
+
+    def test_csv_is_streamed_newest_first(self):
+        response = self.client.get('/api/exports/transactions/csv/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(b''.join(response.streaming_content).decode('utf-8'), (
+            'Date,Description,Amount,Type,Category,Notes,Is Recurring\r\n'
+            '2024-01-03,GROCERY STORE,20.00,debit,Food,,No\r\n'
+            '2024-01-03,"COFFEE, TO GO",4.50,debit,Food,"Team ""offsite""",Yes\r\n'
+            '2024-01-02,PAYROLL,1000.00,credit,,,No\r\n'
+        ))
+
+    def test_excel_has_typed_cells_and_sampled_column_widths(self):
+        Transaction.objects.create(
+            user=self.user, date=date(2024, 1, 1), description='X' * 60, amount=Decimal('0.99'),
+            transaction_type='debit'
+        )
+        
+        response = self.client.get('/api/exports/transactions/excel/')
+        
+        self.assertEqual(response.status_code, 200)
+        ws = load_workbook(io.BytesIO(b''.join(response.streaming_content)))['Transactions']
+        rows = list(ws.values)
+        self.assertEqual(list(rows[0]), TRANSACTION_EXPORT_HEADERS)
+        self.assertTrue(ws['A1'].font.bold)
+        self.assertEqual(rows[1:], [
+            ('2024-01-03', 'GROCERY STORE', 20.0, 'debit', 'Food', None, 'No'),
+            ('2024-01-03', 'COFFEE, TO GO', 4.5, 'debit', 'Food', 'Team "offsite"', 'Yes'),
+            ('2024-01-02', 'PAYROLL', 1000.0, 'credit', None, None, 'No'),
+            ('2024-01-01', 'X' * 60, 0.99, 'debit', None, None, 'No'),
+        ])
+        # Longest of header and values plus 2, capped at 50
+        self.assertEqual(
+            [ws.column_dimensions[column].width for column in 'ABCDEFG'],
+            [12, 50, 8, 8, 10, 16, 14]
+        )
@@ -1,12 +1,27 @@
 from django.urls import path
 from .views import (
-    ExportTransactionsCSVView, ExportTransactionsExcelView,
-    ExportBudgetReportPDFView, ExportCategorySummaryView
+    ExportTransactionsCSVView, ExportTransactionsExcelView, ExportTransactionsColumnarView,
+    ExportBudgetReportPDFView, ExportCategorySummaryView, ExportCategoryPivotView,
+    ExportJobListCreateView, ExportJobDetailView, ExportJobDownloadView
 )
 
 urlpatterns = [
     path('transactions/csv/', ExportTransactionsCSVView.as_view(), name='export_csv'),
     path('transactions/excel/', ExportTransactionsExcelView.as_view(), name='export_excel'),
+    path(
+        'transactions/parquet/',
+        ExportTransactionsColumnarView.as_view(file_format='parquet'),
+        name='export_parquet'
+    ),
+    path(
+        'transactions/arrow/',
+        ExportTransactionsColumnarView.as_view(file_format='arrow'),
+        name='export_arrow'
+    ),
     path('budget-report/pdf/', ExportBudgetReportPDFView.as_view(), name='export_budget_pdf'),
     path('category-summary/', ExportCategorySummaryView.as_view(), name='export_category_summary'),
+    path('category-summary/pivot/', ExportCategoryPivotView.as_view(), name='export_category_pivot'),
+    path('jobs/', ExportJobListCreateView.as_view(), name='export_job_list'),
+    path('jobs/<uuid:pk>/', ExportJobDetailView.as_view(), name='export_job_detail'),
+    path('jobs/<uuid:pk>/download/', ExportJobDownloadView.as_view(), name='export_job_download'),
 ]
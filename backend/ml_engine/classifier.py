@@ -7,12 +7,19 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 from django.conf import settings
+from transactions.normalization import clean_description
+
+# Version of the description preprocessing a model is trained with, stored
+# on the saved pipeline. Models saved before it existed (version 0) were
+# trained on raw descriptions and keep getting raw input until retrained.
+PREPROCESSING_VERSION = 1
 
 
 class TransactionClassifier:
     def __init__(self):
         self.model = None
         self.is_loaded = False
+        self.preprocessing_version = PREPROCESSING_VERSION
         self.model_path = Path(settings.ML_MODEL_PATH) / 'transaction_classifier.joblib'
         self.categories = settings.TRANSACTION_CATEGORIES
     
@@ -37,6 +44,8 @@ class TransactionClassifier:
         if self.model is None:
             self.build_model()
         
+        self.preprocessing_version = PREPROCESSING_VERSION
+        descriptions = self.prepare(descriptions)
         X_train, X_test, y_train, y_test = train_test_split(
             descriptions, categories, test_size=0.2, random_state=42
         )
@@ -57,38 +66,49 @@ class TransactionClassifier:
         if self.model is None:
             raise ValueError("No model to save. Train or load a model first.")
         
+        self.model.preprocessing_version = self.preprocessing_version
         os.makedirs(self.model_path.parent, exist_ok=True)
-        joblib.dump(self.model, self.model_path)
+        # Write to a temp file and rename so readers never see a partial model
+        tmp_path = self.model_path.with_name(f'{self.model_path.name}.{os.getpid()}.tmp')
+        try:
+            joblib.dump(self.model, tmp_path)
+            os.replace(tmp_path, self.model_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
         return str(self.model_path)
     
     def load_model(self):
         if self.model_path.exists():
             self.model = joblib.load(self.model_path)
+            self.preprocessing_version = getattr(self.model, 'preprocessing_version', 0)
             self.is_loaded = True
             return True
         return False
     
+    def prepare(self, descriptions):
+        """Preprocess descriptions the way the current model was trained"""
+        if self.preprocessing_version >= 1:
+            return [clean_description(d) for d in descriptions]
+        return list(descriptions)
+    
     def predict(self, description):
-        if self.model is None:
-            return None, 0.0
-        
-        try:
-            prediction = self.model.predict([description])[0]
-            probabilities = self.model.predict_proba([description])[0]
-            confidence = float(max(probabilities))
-            return prediction, confidence
-        except Exception:
-            return None, 0.0
+        return self.predict_batch([description])[0]
     
     def predict_batch(self, descriptions):
         if self.model is None:
             return [(None, 0.0) for _ in descriptions]
         
+        if len(descriptions) == 0:
+            return []
+        
         try:
-            predictions = self.model.predict(descriptions)
-            probabilities = self.model.predict_proba(descriptions)
-            confidences = [float(max(prob)) for prob in probabilities]
-            return list(zip(predictions, confidences))
+            # A single predict_proba pass yields both the label (argmax) and its confidence
+            probabilities = self.model.predict_proba(self.prepare(descriptions))
+            best = probabilities.argmax(axis=1)
+            predictions = self.model.classes_[best]
+            confidences = probabilities[np.arange(len(best)), best]
+            return list(zip(predictions, confidences.tolist()))
         except Exception:
             return [(None, 0.0) for _ in descriptions]
     
@@ -205,10 +225,12 @@ def get_training_data():
 
 
 def train_initial_model():
+    from .registry import model_registry
+    
     classifier = TransactionClassifier()
     descriptions, categories = get_training_data()
     
     results = classifier.train(descriptions, categories)
-    classifier.save_model()
+    model_registry.publish(classifier)
     
     return results
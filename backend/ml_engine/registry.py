@@ -0,0 +1,58 @@
+import os
+import threading
+
+from .classifier import TransactionClassifier
+
+
+class ModelRegistry:
+    """Keeps one loaded classifier per worker process.
+
+    The model file's (mtime, size) acts as its version stamp: when another
+    process publishes a new model the next lookup reloads it, and the
+    swap is a single reference assignment so in-flight requests keep using
+    the classifier they already hold.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._classifier = None
+        self._version = None
+
+    def _file_version(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get_classifier(self):
+        classifier = self._classifier
+        if classifier is not None and self._file_version(classifier.model_path) == self._version:
+            return classifier
+        
+        with self._lock:
+            classifier = TransactionClassifier()
+            version = self._file_version(classifier.model_path)
+            if self._classifier is None or version != self._version:
+                if version is not None:
+                    classifier.load_model()
+                self._classifier = classifier
+                self._version = version
+            return self._classifier
+
+    def publish(self, classifier):
+        """Persist a freshly trained classifier and make it current in this process"""
+        path = classifier.save_model()
+        classifier.is_loaded = True
+        with self._lock:
+            self._classifier = classifier
+            self._version = self._file_version(path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._classifier = None
+            self._version = None
+
+
+model_registry = ModelRegistry()
@@ -1,3 +1,108 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import joblib
+from django.test import TestCase, override_settings
+
+from .classifier import PREPROCESSING_VERSION, TransactionClassifier, get_training_data
+from .registry import ModelRegistry
+
+
+class ClassifierPreprocessingTests(TestCase):
+    def setUp(self):
+        model_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, model_dir, ignore_errors=True)
+        settings_override = override_settings(ML_MODEL_PATH=model_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.trained = TransactionClassifier()
+        self.trained.train(*get_training_data())
+
+    def test_saved_model_records_preprocessing_version(self):
+        self.trained.save_model()
+        
+        classifier = TransactionClassifier()
+        classifier.load_model()
+        
+        self.assertEqual(classifier.preprocessing_version, PREPROCESSING_VERSION)
+        self.assertEqual(classifier.prepare(['POS STARBUCKS 123456']), ['pos starbucks'])
+
+    def test_models_saved_before_versioning_get_raw_descriptions(self):
+        # Pipelines saved before versioning carry no preprocessing_version
+        joblib.dump(self.trained.model, self.trained.model_path)
+        
+        classifier = TransactionClassifier()
+        classifier.load_model()
+        
+        self.assertEqual(classifier.preprocessing_version, 0)
+        self.assertEqual(classifier.prepare(['POS STARBUCKS #1234']), ['POS STARBUCKS #1234'])
+
+    def test_retraining_a_legacy_model_upgrades_it(self):
+        self.trained.preprocessing_version = 0
+        
+        self.trained.train(*get_training_data())
+        
+        self.assertEqual(self.trained.preprocessing_version, PREPROCESSING_VERSION)
+
+
+class ModelRegistryTests(TestCase):
+    def setUp(self):
+        model_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, model_dir, ignore_errors=True)
+        settings_override = override_settings(ML_MODEL_PATH=model_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.registry = ModelRegistry()
+        self.descriptions, self.categories = get_training_data()
+
+    def train(self, samples=None):
+        classifier = TransactionClassifier()
+        classifier.train(self.descriptions[:samples], self.categories[:samples])
+        return classifier
+
+    def test_reloads_model_published_by_another_process(self):
+        self.registry.publish(self.train())
+        live = self.registry.get_classifier()
+        
+        # Another worker publishes through its own registry
+        ModelRegistry().publish(self.train(samples=200))
+        reloaded = self.registry.get_classifier()
+        
+        self.assertIsNot(reloaded, live)
+        self.assertTrue(reloaded.is_loaded)
+        self.assertEqual(len(reloaded.model.named_steps['classifier'].classes_), len(set(self.categories[:200])))
+
+    def test_unchanged_file_is_not_reloaded(self):
+        self.train().save_model()
+        live = self.registry.get_classifier()
+        
+        with mock.patch.object(TransactionClassifier, 'load_model') as load_model:
+            self.assertIs(self.registry.get_classifier(), live)
+            self.assertIs(self.registry.get_classifier(), live)
+        
+        load_model.assert_not_called()
+
+    def test_failed_write_keeps_live_model(self):
+        self.registry.publish(self.train())
+        live = self.registry.get_classifier()
+        with open(live.model_path, 'rb') as f:
+            saved = f.read()
+        
+        def partial_dump(model, path):
+            with open(path, 'wb') as f:
+                f.write(saved[:100])
+            raise OSError('No space left on device')
+        
+        with mock.patch('ml_engine.classifier.joblib.dump', side_effect=partial_dump):
+            with self.assertRaises(OSError):
+                self.registry.publish(self.train(samples=200))
+        
+        self.assertIs(self.registry.get_classifier(), live)
+        with open(live.model_path, 'rb') as f:
+            self.assertEqual(f.read(), saved)
+        self.assertEqual(os.listdir(live.model_path.parent), [live.model_path.name])
 
-# Create your tests here.
@@ -4,6 +4,7 @@ from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema
 
 from .classifier import TransactionClassifier, train_initial_model, get_training_data
+from .registry import model_registry
 from .serializers import (
     PredictSerializer, PredictResponseSerializer,
     TrainSerializer, TrainResponseSerializer,
@@ -25,8 +26,8 @@ class PredictCategoryView(views.APIView):
         
         descriptions = serializer.validated_data['descriptions']
         
-        classifier = TransactionClassifier()
-        if not classifier.load_model():
+        classifier = model_registry.get_classifier()
+        if not classifier.is_loaded:
             return Response(
                 {'error': 'Model not trained yet. Please train the model first.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -64,15 +65,22 @@ class TrainModelView(views.APIView):
         
         if include_user_data:
             from transactions.models import Transaction
+            from transactions.category_cache import category_resolver
             
-            user_transactions = Transaction.objects.filter(
+            user_transactions = list(Transaction.objects.filter(
                 user=request.user,
                 category__isnull=False
-            ).select_related('category')
+            ).values_list('description', 'category_id'))
+            user_categories = category_resolver.by_id(
+                request.user.id, ids={category_id for _, category_id in user_transactions}
+            )
             
-            for tx in user_transactions:
-                descriptions.append(tx.description)
-                categories.append(tx.category.name.lower())
+            for description, category_id in user_transactions:
+                category = user_categories.get(category_id)
+                if category is None:
+                    continue
+                descriptions.append(description)
+                categories.append(category.name.lower())
         
         if len(descriptions) < 10:
             return Response(
@@ -82,7 +90,7 @@ class TrainModelView(views.APIView):
         
         classifier = TransactionClassifier()
         results = classifier.train(descriptions, categories)
-        classifier.save_model()
+        model_registry.publish(classifier)
         
         return Response({
             'message': 'Model trained successfully',
@@ -98,11 +106,10 @@ class ModelStatusView(views.APIView):
 
     @extend_schema(tags=['ML'], responses={200: ModelStatusSerializer})
     def get(self, request):
-        classifier = TransactionClassifier()
-        is_loaded = classifier.load_model()
+        classifier = model_registry.get_classifier()
         
         return Response({
-            'model_exists': is_loaded,
+            'model_exists': classifier.is_loaded,
             'model_path': str(classifier.model_path),
             'categories': classifier.categories
         })
@@ -132,8 +139,8 @@ class FeatureImportanceView(views.APIView):
         category = request.query_params.get('category')
         top_n = int(request.query_params.get('top_n', 10))
         
-        classifier = TransactionClassifier()
-        if not classifier.load_model():
+        classifier = model_registry.get_classifier()
+        if not classifier.is_loaded:
             return Response(
                 {'error': 'Model not trained yet.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,118 @@
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User, UserPreferences
+from budgets.models import Budget
+from notifications.models import Notification
+from notifications.tasks import check_budget_thresholds
+from transactions.models import Category, Transaction
+
+
+class Command(BaseCommand):
+    help = 'Benchmark check_budget_thresholds against the per-budget loop on synthetic data (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--budgets-per-user', type=int, default=5)
+        parser.add_argument('--transactions-per-user', type=int, default=100)
+        parser.add_argument('--skip-legacy', action='store_true')
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        with transaction.atomic():
+            budget_count = self._populate(options)
+            self.stdout.write(f'{budget_count} active budgets across {options["users"]} users')
+            
+            if not options['skip_legacy']:
+                self._run('per-budget loop', self._legacy_check)
+                Notification.objects.filter(user__email__startswith='bench-').delete()
+            self._run('batched', check_budget_thresholds)
+            
+            transaction.set_rollback(True)
+
+    def _run(self, label, func):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        created = Notification.objects.filter(user__email__startswith='bench-').count()
+        self.stdout.write(self.style.SUCCESS(
+            f'{label:<16} {elapsed:>8.3f} s  {len(queries.captured_queries):>7} queries  {created} notifications'
+        ))
+
+    def _populate(self, options):
+        today = date.today()
+        categories = list(Category.objects.filter(is_system=True)[:8]) or [None]
+        tag = uuid.uuid4().hex[:8]
+        
+        users = User.objects.bulk_create([
+            User(email=f'bench-{tag}-{i}@example.com', username=f'bench-{tag}-{i}')
+            for i in range(options['users'])
+        ], batch_size=1000)
+        UserPreferences.objects.bulk_create([
+            UserPreferences(user=user, notification_enabled=i % 10 != 0)
+            for i, user in enumerate(users)
+        ], batch_size=1000)
+        
+        transactions = []
+        budgets = []
+        for user in users:
+            for i in range(options['transactions_per_user']):
+                transactions.append(Transaction(
+                    user=user,
+                    date=today - timedelta(days=random.randint(0, 27)),
+                    description=f'Bench purchase {i}',
+                    amount=Decimal(random.randint(100, 20000)) / 100,
+                    transaction_type='debit' if random.random() < 0.8 else 'credit',
+                    category=random.choice(categories),
+                    idempotency_hash=uuid.uuid4().hex,
+                ))
+            for i in range(options['budgets_per_user']):
+                budgets.append(Budget(
+                    user=user,
+                    name=f'Bench budget {i}',
+                    category=random.choice(categories + [None]),
+                    amount=Decimal(random.randint(50, 3000)),
+                    start_date=today.replace(day=1),
+                    end_date=today.replace(day=1) + timedelta(days=31),
+                ))
+        Transaction.objects.bulk_create(transactions, batch_size=1000)
+        Budget.objects.bulk_create(budgets, batch_size=1000)
+        
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE transactions')
+                cursor.execute('ANALYZE budgets')
+        return Budget.objects.filter(is_active=True).count()
+
+    def _legacy_check(self):
+        """The original evaluator: one preferences query and two spent queries per budget"""
+        for budget in Budget.objects.filter(is_active=True):
+            user_prefs = UserPreferences.objects.filter(user=budget.user).first()
+            if not user_prefs or not user_prefs.notification_enabled:
+                continue
+            
+            threshold = user_prefs.budget_alert_threshold
+            percentage_used = budget.percentage_used
+            
+            if percentage_used >= threshold and percentage_used < 100:
+                Notification.objects.create(
+                    user=budget.user,
+                    notification_type='budget_threshold',
+                    title=f'Budget Alert: {budget.name}',
+                    message=f'Your budget "{budget.name}" has reached {percentage_used:.1f}% of its limit.',
+                )
+            if percentage_used >= 100:
+                Notification.objects.create(
+                    user=budget.user,
+                    notification_type='budget_exceeded',
+                    title=f'Budget Exceeded: {budget.name}',
+                    message=f'Your budget "{budget.name}" has been exceeded!',
+                )
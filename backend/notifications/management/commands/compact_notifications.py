@@ -0,0 +1,102 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from budgets.models import Budget
+from notifications.models import Notification
+
+BUDGET_ALERT_TYPES = ('budget_threshold', 'budget_exceeded')
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Collapse repeated budget alerts to one per budget, alert type and period and backfill dedup keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        legacy = Notification.objects.filter(
+            notification_type__in=BUDGET_ALERT_TYPES, dedup_key=None
+        ).order_by('pk').values_list('id', 'user_id', 'notification_type', 'metadata', 'created_at')
+        
+        # Survivors chosen so far, as key -> (id, created_at); one entry per
+        # budget, type and period rather than per notification
+        self.keyed = {}
+        self.orphans = {}
+        self.newly_keyed = set()
+        deleted = 0
+        last_pk = None
+        while True:
+            batch = legacy.filter(pk__gt=last_pk) if last_pk is not None else legacy
+            rows = list(batch[:BATCH_SIZE])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            
+            delete_ids, updates = self.compact_batch(rows)
+            deleted += len(delete_ids)
+            if options['dry_run']:
+                continue
+            
+            with transaction.atomic():
+                # Deletes first: a replaced survivor may hold the key being assigned
+                Notification.objects.filter(id__in=delete_ids).delete()
+                Notification.objects.bulk_update(
+                    [Notification(id=notification_id, dedup_key=dedup_key) for notification_id, dedup_key in updates],
+                    ['dedup_key']
+                )
+        
+        if options['dry_run']:
+            self.stdout.write(f'Would delete {deleted} duplicate notifications and key {len(self.newly_keyed)}')
+            return
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} duplicate notifications, keyed {len(self.newly_keyed)}'
+        ))
+
+    def compact_batch(self, rows):
+        """Return (ids to delete, (id, dedup_key) updates) for one batch of legacy alerts.
+        
+        The newest alert per key survives, whether it is in this batch, an
+        earlier one or already keyed. For deleted budgets the period is
+        unknown, so one alert per budget and type is kept, unkeyed.
+        """
+        budget_ids = {(metadata or {}).get('budget_id') for _, _, _, metadata, _ in rows} - {None}
+        periods = dict(Budget.objects.filter(id__in=budget_ids).values_list('id', 'start_date'))
+        periods = {str(budget_id): start_date for budget_id, start_date in periods.items()}
+        
+        keys = []
+        for notification_id, user_id, notification_type, metadata, created_at in rows:
+            budget_id = (metadata or {}).get('budget_id')
+            if budget_id is None:
+                continue
+            if budget_id in periods:
+                key = (user_id, Notification.budget_dedup_key(budget_id, notification_type, periods[budget_id]))
+            else:
+                key = (user_id, budget_id, notification_type)
+            keys.append((key, budget_id in periods, notification_id, created_at))
+        
+        existing = Notification.objects.filter(
+            dedup_key__in={key[1] for key, is_keyed, _, _ in keys if is_keyed and key not in self.keyed}
+        ).values_list('user_id', 'dedup_key', 'id', 'created_at')
+        for user_id, dedup_key, notification_id, created_at in existing:
+            self.keyed.setdefault((user_id, dedup_key), (notification_id, created_at))
+        
+        delete_ids = []
+        assigned = {}
+        for key, is_keyed, notification_id, created_at in keys:
+            survivors = self.keyed if is_keyed else self.orphans
+            current = survivors.get(key)
+            if current is not None and current[1] >= created_at:
+                delete_ids.append(notification_id)
+                continue
+            
+            if current is not None:
+                delete_ids.append(current[0])
+                assigned.pop(current[0], None)
+            survivors[key] = (notification_id, created_at)
+            if is_keyed:
+                assigned[notification_id] = key[1]
+                self.newly_keyed.add(key)
+        
+        return delete_ids, list(assigned.items())
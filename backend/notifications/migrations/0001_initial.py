@@ -0,0 +1,57 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:01
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email_enabled', models.BooleanField(default=True)),
+                ('webhook_enabled', models.BooleanField(default=False)),
+                ('webhook_url', models.URLField(blank=True)),
+                ('budget_threshold_alerts', models.BooleanField(default=True)),
+                ('budget_exceeded_alerts', models.BooleanField(default=True)),
+                ('recurring_payment_alerts', models.BooleanField(default=True)),
+                ('large_transaction_alerts', models.BooleanField(default=True)),
+                ('large_transaction_threshold', models.DecimalField(decimal_places=2, default=1000.0, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_preferences', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notification_preferences',
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('notification_type', models.CharField(choices=[('budget_threshold', 'Budget Threshold Warning'), ('budget_exceeded', 'Budget Exceeded'), ('recurring_upcoming', 'Upcoming Recurring Payment'), ('large_transaction', 'Large Transaction Alert'), ('statement_processed', 'Statement Processed'), ('export_ready', 'Export Ready'), ('system', 'System Notification')], max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('is_read', models.BooleanField(default=False)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notifications',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='notificatio_user_id_611c58_idx'), models.Index(fields=['user', 'is_read'], name='notificatio_user_id_a4dd5c_idx')],
+            },
+        ),
+    ]
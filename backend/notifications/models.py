@@ -26,6 +26,7 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(null=True, blank=True)
     metadata = models.JSONField(default=dict, blank=True)
+    dedup_key = models.CharField(max_length=255, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -35,10 +36,26 @@ class Notification(models.Model):
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['user', 'is_read']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'dedup_key'],
+                name='notification_unique_dedup_key'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.title}"
 
+    @staticmethod
+    def budget_dedup_key(budget_id, notification_type, period_start):
+        """One budget alert of each type per budget period"""
+        return f'budget:{budget_id}:{notification_type}:{period_start.isoformat()}'
+
+    @staticmethod
+    def recurring_dedup_key(pattern_id, next_expected):
+        """One upcoming-payment alert per recurring pattern and expected date"""
+        return f'recurring:{pattern_id}:{next_expected.isoformat()}'
+
     def mark_as_read(self):
         from django.utils import timezone
         self.is_read = True
@@ -58,49 +58,72 @@ def send_webhook_notification(notification_id):
         print(f"Error sending webhook notification: {e}")
 
 
+BUDGET_CHECK_BATCH_SIZE = 1000
+
+
 @shared_task
 def check_budget_thresholds():
     """Check all budgets and send threshold warnings"""
     from budgets.models import Budget
-    from accounts.models import UserPreferences
+    from django.db.models import F
     
-    budgets = Budget.objects.filter(is_active=True)
+    budgets = Budget.objects.filter(
+        is_active=True,
+        user__preferences__notification_enabled=True,
+    ).with_spent().annotate(
+        alert_threshold=F('user__preferences__budget_alert_threshold')
+    ).order_by().values_list(
+        'id', 'user_id', 'name', 'amount', 'start_date', 'spent_amount', 'alert_threshold'
+    )
     
-    for budget in budgets:
-        user_prefs = UserPreferences.objects.filter(
-            user=budget.user
-        ).first()
-        
-        if not user_prefs or not user_prefs.notification_enabled:
+    # Alerts already sent for a budget period hit the dedup constraint and are skipped
+    pending = []
+    for row in budgets.iterator(chunk_size=BUDGET_CHECK_BATCH_SIZE):
+        notification = build_budget_notification(*row)
+        if notification is None:
             continue
         
-        threshold = user_prefs.budget_alert_threshold
-        percentage_used = budget.percentage_used
-        
-        if percentage_used >= threshold and percentage_used < 100:
-            Notification.objects.create(
-                user=budget.user,
-                notification_type='budget_threshold',
-                title=f'Budget Alert: {budget.name}',
-                message=f'Your budget "{budget.name}" has reached {percentage_used:.1f}% of its limit.',
-                metadata={
-                    'budget_id': str(budget.id),
-                    'percentage_used': float(percentage_used),
-                    'threshold': float(threshold)
-                }
-            )
-        
-        if percentage_used >= 100:
-            Notification.objects.create(
-                user=budget.user,
-                notification_type='budget_exceeded',
-                title=f'Budget Exceeded: {budget.name}',
-                message=f'Your budget "{budget.name}" has been exceeded!',
-                metadata={
-                    'budget_id': str(budget.id),
-                    'percentage_used': float(percentage_used)
-                }
-            )
+        pending.append(notification)
+        if len(pending) >= BUDGET_CHECK_BATCH_SIZE:
+            Notification.objects.bulk_create(pending, ignore_conflicts=True)
+            pending = []
+    
+    if pending:
+        Notification.objects.bulk_create(pending, ignore_conflicts=True)
+
+
+def build_budget_notification(budget_id, user_id, name, amount, start_date, spent, threshold):
+    """Return the unsaved threshold/exceeded Notification for a budget, if any"""
+    percentage_used = min((spent / amount) * 100, 100) if amount else 0
+    
+    if percentage_used >= 100:
+        return Notification(
+            user_id=user_id,
+            notification_type='budget_exceeded',
+            dedup_key=Notification.budget_dedup_key(budget_id, 'budget_exceeded', start_date),
+            title=f'Budget Exceeded: {name}',
+            message=f'Your budget "{name}" has been exceeded!',
+            metadata={
+                'budget_id': str(budget_id),
+                'percentage_used': float(percentage_used)
+            }
+        )
+    
+    if percentage_used >= threshold:
+        return Notification(
+            user_id=user_id,
+            notification_type='budget_threshold',
+            dedup_key=Notification.budget_dedup_key(budget_id, 'budget_threshold', start_date),
+            title=f'Budget Alert: {name}',
+            message=f'Your budget "{name}" has reached {percentage_used:.1f}% of its limit.',
+            metadata={
+                'budget_id': str(budget_id),
+                'percentage_used': float(percentage_used),
+                'threshold': float(threshold)
+            }
+        )
+    
+    return None
 
 
 @shared_task
@@ -117,18 +140,26 @@ def check_recurring_payments():
         next_expected__gte=timezone.now().date()
     )
     
-    for pattern in patterns:
-        Notification.objects.create(
-            user=pattern.user,
-            notification_type='recurring_upcoming',
-            title='Upcoming Recurring Payment',
-            message=f'You have a recurring payment of ${pattern.average_amount} for "{pattern.merchant_name or pattern.description_pattern}" coming up on {pattern.next_expected}.',
-            metadata={
-                'pattern_id': str(pattern.id),
-                'amount': float(pattern.average_amount),
-                'date': pattern.next_expected.isoformat()
-            }
-        )
+    # Patterns stay in the window for several daily runs; repeats hit the dedup constraint
+    Notification.objects.bulk_create(
+        [
+            Notification(
+                user_id=pattern.user_id,
+                notification_type='recurring_upcoming',
+                dedup_key=Notification.recurring_dedup_key(pattern.id, pattern.next_expected),
+                title='Upcoming Recurring Payment',
+                message=f'You have a recurring payment of ${pattern.average_amount} for "{pattern.merchant_name or pattern.description_pattern}" coming up on {pattern.next_expected}.',
+                metadata={
+                    'pattern_id': str(pattern.id),
+                    'amount': float(pattern.average_amount),
+                    'date': pattern.next_expected.isoformat()
+                }
+            )
+            for pattern in patterns.iterator(chunk_size=BUDGET_CHECK_BATCH_SIZE)
+        ],
+        batch_size=BUDGET_CHECK_BATCH_SIZE,
+        ignore_conflicts=True
+    )
 
 
 @shared_task
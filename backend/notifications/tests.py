@@ -0,0 +1,145 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import User, UserPreferences
+from budgets.models import Budget
+from transactions.models import Category, RecurringPattern, Transaction
+from .models import Notification
+from .tasks import check_budget_thresholds, check_recurring_payments
+
+
+def make_user(email='user@example.com'):
+    return User.objects.create_user(email=email, username=email, password='test-pass-123')
+
+
+class BudgetAlertDedupTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        UserPreferences.objects.create(user=self.user, budget_alert_threshold=Decimal('80.00'))
+        self.category = Category.objects.create(name='Food', user=self.user)
+        self.start = date.today().replace(day=1)
+        self.budget = Budget.objects.create(
+            user=self.user, name='Food', category=self.category, amount=Decimal('100.00'),
+            start_date=self.start, end_date=self.start + timedelta(days=40)
+        )
+
+    def spend(self, amount):
+        Transaction.objects.create(
+            user=self.user, date=self.start, description=f'GROCER {amount}',
+            amount=Decimal(amount), transaction_type='debit', category=self.category
+        )
+
+    def alerts(self):
+        return list(
+            Notification.objects.filter(user=self.user)
+            .order_by('created_at').values_list('notification_type', 'dedup_key')
+        )
+
+    def test_repeated_checks_alert_once_per_type_and_period(self):
+        self.spend('85.00')
+        check_budget_thresholds()
+        check_budget_thresholds()
+        
+        threshold_key = Notification.budget_dedup_key(self.budget.id, 'budget_threshold', self.start)
+        self.assertEqual(self.alerts(), [('budget_threshold', threshold_key)])
+        
+        self.spend('20.00')
+        check_budget_thresholds()
+        check_budget_thresholds()
+        
+        exceeded_key = Notification.budget_dedup_key(self.budget.id, 'budget_exceeded', self.start)
+        self.assertEqual(
+            self.alerts(),
+            [('budget_threshold', threshold_key), ('budget_exceeded', exceeded_key)]
+        )
+
+    def test_new_budget_period_alerts_again(self):
+        self.spend('85.00')
+        check_budget_thresholds()
+        
+        self.budget.start_date -= timedelta(days=1)
+        self.budget.save()
+        check_budget_thresholds()
+        
+        self.assertEqual(len(self.alerts()), 2)
+
+    def test_compact_notifications_collapses_legacy_alerts(self):
+        for _ in range(3):
+            Notification.objects.create(
+                user=self.user, notification_type='budget_threshold', title='Budget Alert: Food',
+                message='Over threshold', metadata={'budget_id': str(self.budget.id)}
+            )
+        
+        call_command('compact_notifications', stdout=io.StringIO())
+        
+        self.assertEqual(self.alerts(), [
+            ('budget_threshold', Notification.budget_dedup_key(self.budget.id, 'budget_threshold', self.start))
+        ])
+        
+        # Already keyed, so the task does not alert again
+        self.spend('85.00')
+        check_budget_thresholds()
+        self.assertEqual(len(self.alerts()), 1)
+
+    def test_compact_notifications_keeps_newest_alert_across_batches(self):
+        created = []
+        for days_ago in range(5):
+            notification = Notification.objects.create(
+                user=self.user, notification_type='budget_threshold', title='Budget Alert: Food',
+                message='Over threshold', metadata={'budget_id': str(self.budget.id)}
+            )
+            Notification.objects.filter(pk=notification.pk).update(
+                created_at=notification.created_at - timedelta(days=days_ago)
+            )
+            created.append(notification.pk)
+        
+        with mock.patch('notifications.management.commands.compact_notifications.BATCH_SIZE', 2):
+            call_command('compact_notifications', stdout=io.StringIO())
+        
+        notification = Notification.objects.get(user=self.user)
+        self.assertEqual(notification.pk, created[0])
+        self.assertEqual(
+            notification.dedup_key,
+            Notification.budget_dedup_key(self.budget.id, 'budget_threshold', self.start)
+        )
+
+
+class RecurringPaymentAlertTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def add_pattern(self, next_expected):
+        return RecurringPattern.objects.create(
+            user=self.user, description_pattern='NETFLIX', merchant_name='Netflix',
+            average_amount=Decimal('15.99'), frequency='monthly', next_expected=next_expected
+        )
+
+    def test_one_alert_per_pattern_and_expected_date(self):
+        pattern = self.add_pattern(date.today() + timedelta(days=2))
+        self.add_pattern(date.today() + timedelta(days=10))
+        
+        # The task runs daily and the pattern stays in its 3-day window
+        check_recurring_payments()
+        check_recurring_payments()
+        
+        notification = Notification.objects.get(user=self.user)
+        self.assertEqual(notification.notification_type, 'recurring_upcoming')
+        self.assertEqual(
+            notification.dedup_key,
+            Notification.recurring_dedup_key(pattern.id, pattern.next_expected)
+        )
+
+    def test_new_expected_date_alerts_again(self):
+        pattern = self.add_pattern(date.today())
+        check_recurring_payments()
+        
+        pattern.next_expected = date.today() + timedelta(days=1)
+        pattern.save()
+        check_recurring_payments()
+        
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 2)
@@ -0,0 +1,79 @@
+from django.db.models import Sum, Count, Q
+
+from .models import Transaction
+from .category_cache import category_resolver
+from .rollups import whole_month_span, rollups_for_span
+
+
+def summarize_transactions(user, start_date=None, end_date=None):
+    """Income, expenses, count and debit breakdown by category for a date range.
+
+    Everything comes from one grouped query using conditional aggregation;
+    per-category rows are folded into the totals here, and category names
+    and colors are filled in from the category resolver. Ranges made of
+    whole months are answered from the monthly rollups instead of scanning
+    transactions.
+    """
+    return _fold_category_rows(user, summary_rows(user, start_date, end_date))
+
+
+def summary_rows(user, start_date=None, end_date=None):
+    """The grouped per-category query behind ``summarize_transactions``"""
+    span = whole_month_span(start_date, end_date)
+    if span is not None:
+        return rollups_for_span(user, span).order_by().values('category_id').annotate(
+            income=Sum('total', filter=Q(transaction_type='credit')),
+            expenses=Sum('total', filter=Q(transaction_type='debit')),
+            expense_count=Sum('count', filter=Q(transaction_type='debit')),
+            count=Sum('count'),
+        )
+    
+    queryset = Transaction.objects.filter(user=user)
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    
+    return queryset.order_by().values('category_id').annotate(
+        income=Sum('amount', filter=Q(transaction_type='credit')),
+        expenses=Sum('amount', filter=Q(transaction_type='debit')),
+        expense_count=Count('id', filter=Q(transaction_type='debit')),
+        count=Count('id'),
+    )
+
+
+def _fold_category_rows(user, rows):
+    rows = list(rows)
+    categories = category_resolver.by_id(user.id, ids={row['category_id'] for row in rows})
+    
+    income = 0
+    expenses = 0
+    count = 0
+    by_category = []
+    for row in rows:
+        income += row['income'] or 0
+        expenses += row['expenses'] or 0
+        count += row['count']
+        
+        if row['category_id'] is None or not row['expense_count']:
+            continue
+        category = categories.get(row['category_id'])
+        if category is None:
+            # Deleted between the aggregate query and the lookup
+            continue
+        by_category.append({
+            'category__id': category.id,
+            'category__name': category.name,
+            'category__color': category.color,
+            'total': row['expenses'],
+            'count': row['expense_count'],
+        })
+    
+    by_category.sort(key=lambda item: item['total'], reverse=True)
+    
+    return {
+        'income': income,
+        'expenses': expenses,
+        'count': count,
+        'by_category': by_category,
+    }
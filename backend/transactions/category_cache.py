@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CategoryResolver:
+    """Process-level cache of categories keyed by lowercased name.
+
+    System categories are loaded once; user categories are loaded per user on
+    first use. Entries are dropped by the Category save/delete signals and
+    expire after ``ttl`` seconds so other worker processes pick up changes.
+    At most ``max_users`` users are kept, least recently used evicted first.
+    """
+
+    def __init__(self, ttl=300, max_users=1024):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._system = None
+        self._system_loaded_at = 0
+        self._users = OrderedDict()
+
+    def _expired(self, loaded_at):
+        return time.monotonic() - loaded_at > self.ttl
+
+    def _system_categories(self):
+        from .models import Category
+        
+        with self._lock:
+            if self._system is None or self._expired(self._system_loaded_at):
+                self._system = {
+                    c.name.lower(): c
+                    for c in Category.objects.filter(is_system=True)
+                }
+                self._system_loaded_at = time.monotonic()
+            return self._system
+
+    def _user_categories(self, user_id):
+        from .models import Category
+        
+        key = str(user_id)
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is None or self._expired(entry[1]):
+                categories = {
+                    c.name.lower(): c
+                    for c in Category.objects.filter(user_id=user_id, is_system=False)
+                }
+                entry = (categories, time.monotonic())
+                self._users[key] = entry
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            self._users.move_to_end(key)
+            return entry[0]
+
+    def system_category(self, name):
+        if not name:
+            return None
+        return self._system_categories().get(name.lower())
+
+    def by_id(self, user_id, ids=None):
+        """Map of category id to category for every category visible to the user.
+        
+        Any of ``ids`` missing from the cache (e.g. created in another worker
+        since it was loaded) are fetched in one query and merged in, so callers
+        can rely on every referenced category being present.
+        """
+        categories = {c.id: c for c in self._system_categories().values()}
+        categories.update({c.id: c for c in self._user_categories(user_id).values()})
+        
+        missing = {category_id for category_id in ids or () if category_id is not None}
+        missing -= categories.keys()
+        if missing:
+            categories.update(self._load_missing(user_id, missing))
+        return categories
+
+    def _load_missing(self, user_id, ids):
+        from .models import Category
+        
+        loaded = {c.id: c for c in Category.objects.filter(id__in=ids)}
+        with self._lock:
+            user_entry = self._users.get(str(user_id))
+            for category in loaded.values():
+                if category.is_system:
+                    if self._system is not None:
+                        self._system[category.name.lower()] = category
+                elif user_entry is not None and str(category.user_id) == str(user_id):
+                    user_entry[0][category.name.lower()] = category
+        return loaded
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._system = None
+            else:
+                self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._system = None
+            self._users.clear()
+
+
+category_resolver = CategoryResolver()
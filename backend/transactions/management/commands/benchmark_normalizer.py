@@ -0,0 +1,85 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from transactions.normalization import clean_description, extract_merchant_name, normalize_description
+
+
+MERCHANT_TEMPLATES = [
+    'POS PURCHASE WOOLWORTHS {store} {card}',
+    'CHECKERS HYPER {store} CARD {card}',
+    'PICK N PAY #{ref} JOHANNESBURG',
+    'UBER *TRIP {ref} HELP.UBER.COM',
+    'NETFLIX.COM {ref} LOS GATOS',
+    'SPOTIFY P{ref} STOCKHOLM',
+    'DEBIT ORDER DISCOVERY HEALTH {ref}',
+    'ENGEN GARAGE {store}   SANDTON',
+    'TAKEALOT.COM ORDER #{ref}',
+    'MONTHLY ACCOUNT FEE',
+    'ATM WITHDRAWAL {store} CARD {card}',
+    'AMAZON MKTPLACE PMTS AMZN.COM/BILL {ref}',
+    'STARBUCKS STORE #{store}',
+    'CITY OF CAPE TOWN MUNICIPAL {ref}',
+    'VODACOM PREPAID {phone}',
+]
+
+
+def legacy_normalize_description(description):
+    """The per-call implementation the shared normalizer replaced"""
+    text = description.lower()
+    text = re.sub(r'\d{4,}', '', text)
+    text = re.sub(r'#\d+', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    
+    return text[:50] if text else description[:50].lower()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark description normalization on a synthetic corpus of bank descriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--distinct', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            rng.choice(MERCHANT_TEMPLATES).format(
+                store=rng.randint(100, 9999),
+                card=f'{rng.randint(0, 9999):04d}',
+                ref=rng.randint(10000, 99999999),
+                phone=f'0{rng.randint(600000000, 849999999)}',
+            )
+            for _ in range(options['distinct'])
+        ]
+        # Heavy-tailed reuse: a few merchants account for most rows, as on real statements
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        corpus = rng.choices(vocabulary, weights=weights, k=options['rows'])
+        
+        mismatches = sum(legacy_normalize_description(d) != normalize_description(d) for d in vocabulary)
+        if mismatches:
+            self.stderr.write(self.style.ERROR(f'{mismatches} descriptions normalize differently'))
+        
+        for cached in (clean_description, normalize_description, extract_merchant_name):
+            cached.cache_clear()
+        
+        self._report('legacy re.sub per call', corpus, legacy_normalize_description)
+        self._report('normalize_description (cold)', corpus, normalize_description)
+        self._report('normalize_description (warm)', corpus, normalize_description)
+        self._report('extract_merchant_name', corpus, lambda d: extract_merchant_name(normalize_description(d)))
+        
+        info = normalize_description.cache_info()
+        self.stdout.write(f'cache: {info.hits} hits, {info.misses} misses, {info.currsize} entries')
+
+    def _report(self, label, corpus, func):
+        started = time.perf_counter()
+        for description in corpus:
+            func(description)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{label:<32} {elapsed * 1000:>9.1f} ms  {len(corpus) / elapsed:>12,.0f} rows/s'
+        )
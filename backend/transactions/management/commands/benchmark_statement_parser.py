@@ -0,0 +1,76 @@
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from transactions.tasks import (
+    DateParser, parse_date, parse_csv_statement, extract_transaction_from_line
+)
+
+
+MERCHANTS = [
+    'STARBUCKS STORE', 'WHOLE FOODS MARKET', 'SHELL OIL', 'NETFLIX.COM',
+    'UBER TRIP', 'AMAZON MKTPLACE PMTS', 'CVS PHARMACY', 'DIRECT DEPOSIT PAYROLL',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark statement parsing (date detection, CSV rows, PDF lines)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--date-format', default='%d/%m/%Y')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        date_format = options['date_format']
+        rng = random.Random(options['seed'])
+        
+        start = date(2020, 1, 1)
+        dates = [start + timedelta(days=rng.randint(0, 1500)) for _ in range(rows)]
+        date_strings = [d.strftime(date_format) for d in dates]
+        
+        self._report('parse_date (try every format)', rows, lambda: [parse_date(s) for s in date_strings])
+        
+        def detect_and_parse():
+            date_parser = DateParser()
+            return [date_parser.parse(s) for s in date_strings]
+        self._report('DateParser (detected format)', rows, detect_and_parse)
+        
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        try:
+            with os.fdopen(fd, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Date', 'Description', 'Amount'])
+                for date_str in date_strings:
+                    writer.writerow([
+                        date_str,
+                        f'{rng.choice(MERCHANTS)} #{rng.randint(100, 9999)}',
+                        f'-{rng.randint(1, 50000) / 100:.2f}',
+                    ])
+            self._report('parse_csv_statement', rows, lambda: sum(1 for _ in parse_csv_statement(path)))
+        finally:
+            os.remove(path)
+        
+        lines = [
+            f'{d.strftime("%m/%d/%Y")} {rng.choice(MERCHANTS)} ${rng.randint(1, 50000) / 100:,.2f}'
+            for d in dates
+        ]
+        
+        def extract_lines():
+            date_parser = DateParser()
+            return [extract_transaction_from_line(line, date_parser) for line in lines]
+        self._report('extract_transaction_from_line', rows, extract_lines)
+
+    def _report(self, label, rows, func):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{label:<34} {elapsed * 1000:>9.1f} ms  {rows / elapsed:>12,.0f} rows/s'
+        )
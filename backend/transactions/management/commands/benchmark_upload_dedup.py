@@ -0,0 +1,61 @@
+import hashlib
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from accounts.models import User
+from transactions.models import StatementUpload
+
+
+class Command(BaseCommand):
+    help = 'Benchmark duplicate-upload detection as upload history grows (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000])
+        parser.add_argument('--lookups', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create(
+                email=f'bench-{uuid.uuid4().hex}@example.com',
+                username=f'bench-{uuid.uuid4().hex}'
+            )
+            
+            history = 0
+            for size in sorted(options['sizes']):
+                StatementUpload.objects.bulk_create([
+                    StatementUpload(
+                        user=user,
+                        file=f'statements/bench_{i}.csv',
+                        original_filename=f'bench_{i}.csv',
+                        file_type='csv',
+                        status='completed',
+                        file_hash=hashlib.sha256(f'{user.id}:{i}'.encode()).hexdigest()
+                    )
+                    for i in range(history, size)
+                ], batch_size=1000)
+                history = size
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE statement_uploads')
+                
+                self._report(user, size, options['lookups'])
+            
+            self._explain(user)
+            transaction.set_rollback(True)
+
+    def _report(self, user, size, lookups):
+        missing = [hashlib.sha256(f'missing:{i}'.encode()).hexdigest() for i in range(lookups)]
+        started = time.perf_counter()
+        for file_hash in missing:
+            StatementUpload.objects.filter(user=user, file_hash=file_hash).first()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{size:>7} uploads  {elapsed / lookups * 1000:>8.3f} ms per dedup lookup'
+        )
+
+    def _explain(self, user):
+        queryset = StatementUpload.objects.filter(user=user, file_hash='0' * 64).order_by('-created_at')[:1]
+        self.stdout.write('\n' + queryset.explain())
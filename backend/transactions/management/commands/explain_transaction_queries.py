@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import User
+from budgets.models import Budget
+from exports.renderers import category_summary_rows, export_rows, filter_export_transactions
+from transactions.aggregation import summary_rows
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the querysets the per-user transaction endpoints run and fail on sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='User whose data the queries run against')
+        parser.add_argument('--days', type=int, default=30, help='Date range for range queries')
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options['email']).first()
+        if user is None:
+            raise CommandError(f"No user with email {options['email']}")
+        
+        today = date.today()
+        start_date = today - timedelta(days=options['days'])
+        # Whole previous month, which summaries answer from the rollups
+        month_end = today.replace(day=1) - timedelta(days=1)
+        month_start = month_end.replace(day=1)
+        
+        range_params = {'start_date': start_date.isoformat(), 'end_date': today.isoformat()}
+        category_id = Transaction.objects.filter(
+            user=user, category__isnull=False
+        ).values_list('category_id', flat=True).first()
+        
+        queries = {
+            'transaction list': Transaction.objects.filter(user=user).select_related(
+                'category', 'ml_category'
+            )[:50],
+            'summary (date range)': summary_rows(user, start_date, today),
+            'summary (whole months, rollups)': summary_rows(user, month_start, month_end),
+            'budget list': Budget.objects.filter(user=user).select_related('category').with_spent(),
+            'budget summary': Budget.objects.filter(user=user).current(as_of=today),
+            'export': export_rows(filter_export_transactions(user, range_params)),
+            'export (category)': export_rows(
+                filter_export_transactions(user, {**range_params, 'category': category_id})
+            ),
+            'category summary export': category_summary_rows(user, range_params),
+        }
+        
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+        
+        failures = []
+        for label, queryset in queries.items():
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(plan + '\n')
+            if 'Seq Scan on transactions' in plan or 'SCAN transactions' in plan:
+                failures.append(label)
+        
+        if failures:
+            raise CommandError(f"Sequential scan on transactions for: {', '.join(failures)}")
+        
+        self.stdout.write(self.style.SUCCESS('All transaction queries use indexes'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from transactions.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild monthly rollups from raw transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild rollups for this email')
+
+    def handle(self, *args, **options):
+        user_id = None
+        if options['user']:
+            user = User.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['user']}")
+            user_id = user.id
+        
+        created = rebuild_rollups(user_id)
+        
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} monthly rollups'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statementupload',
+            name='rows_processed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='statementupload',
+            name='rows_total',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_statementupload_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='statementupload',
+            index=models.Index(fields=['user', 'file_hash', '-created_at'], name='statement_u_user_id_9190db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statementupload',
+            index=models.Index(fields=['user', '-created_at'], name='statement_u_user_id_5b6f86_idx'),
+        ),
+    ]
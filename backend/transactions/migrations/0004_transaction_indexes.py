@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_statementupload_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-date', '-created_at'], name='transaction_user_id_f06738_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_type', 'date'], include=('amount',), name='transaction_user_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category', 'date'], include=('amount', 'transaction_type'), name='transaction_user_cat_date_idx'),
+        ),
+    ]
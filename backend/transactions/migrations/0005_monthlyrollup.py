@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-17 15:57
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum, Count
+from django.db.models.functions import ExtractYear, ExtractMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlyRollup = apps.get_model('transactions', 'MonthlyRollup')
+    
+    rows = Transaction.objects.order_by().annotate(
+        year=ExtractYear('date'), month=ExtractMonth('date')
+    ).values('user_id', 'year', 'month', 'category_id', 'transaction_type').annotate(
+        total=Sum('amount'), count=Count('id')
+    )
+    MonthlyRollup.objects.bulk_create(
+        (MonthlyRollup(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_transaction_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('transaction_type', models.CharField(choices=[('debit', 'Debit'), ('credit', 'Credit')], max_length=10)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='transactions.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'monthly_rollups',
+                'ordering': ['-year', '-month'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('user', 'year', 'month', 'category', 'transaction_type'), name='monthly_rollup_unique_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'year', 'month', 'transaction_type'), name='monthly_rollup_unique_uncategorized'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
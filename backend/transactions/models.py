@@ -32,9 +32,10 @@ class Transaction(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Every Meta index leads with user, so the FK needs no index of its own
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
-        related_name='transactions'
+        related_name='transactions', db_index=False
     )
     date = models.DateField()
     description = models.TextField()
@@ -64,6 +65,22 @@ class Transaction(models.Model):
     class Meta:
         db_table = 'transactions'
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Listing, exports and date-range summaries for a user
+            models.Index(fields=['user', '-date', '-created_at']),
+            # Income/expense totals and budget spent without a category
+            models.Index(
+                fields=['user', 'transaction_type', 'date'],
+                include=['amount'],
+                name='transaction_user_type_date_idx',
+            ),
+            # Per-category breakdowns and category budgets
+            models.Index(
+                fields=['user', 'category', 'date'],
+                include=['amount', 'transaction_type'],
+                name='transaction_user_cat_date_idx',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.idempotency_hash:
@@ -75,6 +92,45 @@ class Transaction(models.Model):
         return f"{self.date} - {self.description[:30]} - ${self.amount}"
 
 
+class MonthlyRollup(models.Model):
+    """Per-user monthly totals by category and type, kept in step with transactions"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='monthly_rollups'
+    )
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='monthly_rollups'
+    )
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'monthly_rollups'
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month', 'category', 'transaction_type'],
+                condition=models.Q(category__isnull=False),
+                name='monthly_rollup_unique_category',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month', 'transaction_type'],
+                condition=models.Q(category__isnull=True),
+                name='monthly_rollup_unique_uncategorized',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} {self.transaction_type} - ${self.total}"
+
+
 class StatementUpload(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -84,15 +140,18 @@ class StatementUpload(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Both Meta indexes lead with user, so the FK needs no index of its own
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
-        related_name='statement_uploads'
+        related_name='statement_uploads', db_index=False
     )
     file = models.FileField(upload_to='statements/')
     original_filename = models.CharField(max_length=255)
     file_type = models.CharField(max_length=10)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     transactions_count = models.IntegerField(default=0)
+    rows_total = models.IntegerField(null=True, blank=True)
+    rows_processed = models.IntegerField(default=0)
     error_message = models.TextField(blank=True)
     file_hash = models.CharField(max_length=64)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -101,10 +160,22 @@ class StatementUpload(models.Model):
     class Meta:
         db_table = 'statement_uploads'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'file_hash', '-created_at']),
+            models.Index(fields=['user', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.original_filename} - {self.status}"
 
+    @property
+    def progress_percent(self):
+        if self.status == 'completed':
+            return 100.0
+        if not self.rows_total:
+            return 0.0
+        return round(min(self.rows_processed / self.rows_total, 1) * 100, 1)
+
 
 class RecurringPattern(models.Model):
     FREQUENCY_CHOICES = [
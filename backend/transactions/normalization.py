@@ -0,0 +1,36 @@
+"""Description normalization shared by recurring detection, merchant
+extraction and the ML classifier.
+
+Bank descriptions repeat heavily (the same merchant string on every
+statement), so results are memoized per input string in bounded LRU caches.
+"""
+import re
+from functools import lru_cache
+
+NORMALIZER_CACHE_SIZE = 65536
+
+_LONG_NUMBER_PATTERN = re.compile(r'\d{4,}')
+_REFERENCE_PATTERN = re.compile(r'#\d+')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def clean_description(description):
+    """Lowercase and strip card/reference numbers and repeated whitespace"""
+    text = _LONG_NUMBER_PATTERN.sub('', description.lower())
+    text = _REFERENCE_PATTERN.sub('', text)
+    return _WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+@lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def normalize_description(description):
+    text = clean_description(description)
+    return text[:50] if text else description[:50].lower()
+
+
+@lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def extract_merchant_name(description):
+    parts = description.split()
+    if parts:
+        return ' '.join(parts[:3]).title()
+    return description.title()
@@ -0,0 +1,125 @@
+"""Vectorized interval analysis for recurring-payment detection.
+
+Groups are passed flattened: ``dates`` (day ordinals, ascending within each
+group) and ``amounts`` hold every row back to back, and ``offsets`` marks where
+each group starts, with a final entry equal to the total row count.
+"""
+import numpy as np
+
+# (frequency, lowest and highest median interval in days)
+RECURRING_FREQUENCIES = [
+    ('weekly', 5, 9),
+    ('biweekly', 12, 16),
+    ('monthly', 25, 35),
+    ('quarterly', 85, 100),
+    ('yearly', 350, 380),
+]
+
+# Std/mean of the intervals above which payments are too irregular to be recurring
+MAX_INTERVAL_DISPERSION = 0.35
+# 1 / (1 + coefficient of variation of the amounts); 0.5 means std == mean
+MIN_AMOUNT_STABILITY = 0.5
+
+
+def flatten_groups(groups):
+    """Build (dates, amounts, offsets) from a list of [(date, amount), ...] groups"""
+    counts = np.fromiter((len(group) for group in groups), dtype=np.int64, count=len(groups))
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    
+    total = int(offsets[-1])
+    dates = np.fromiter(
+        (tx_date.toordinal() for group in groups for tx_date, _ in group),
+        dtype=np.int64, count=total
+    )
+    amounts = np.fromiter(
+        (amount for group in groups for _, amount in group),
+        dtype=np.float64, count=total
+    )
+    return dates, amounts, offsets
+
+
+def analyze_intervals(dates, amounts, offsets):
+    """Per-group interval and amount statistics plus the detected frequency.
+    
+    Returns a dict of arrays with one entry per group: ``count``,
+    ``interval_mean``, ``interval_median``, ``interval_dispersion``,
+    ``amount_mean``, ``amount_stability``, ``last_date`` and ``next_expected``
+    (day ordinals), ``frequency`` ('' when not recurring) and ``is_recurring``.
+    """
+    dates = np.asarray(dates, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    
+    counts = np.diff(offsets)
+    group_count = len(counts)
+    row_groups = np.repeat(np.arange(group_count), counts)
+    
+    # Intervals between consecutive rows of the same group
+    same_group = row_groups[1:] == row_groups[:-1]
+    intervals = np.diff(dates)[same_group].astype(np.float64)
+    interval_groups = row_groups[1:][same_group]
+    interval_counts = np.maximum(counts - 1, 0)
+    has_intervals = interval_counts > 0
+    safe_interval_counts = np.where(has_intervals, interval_counts, 1)
+    
+    interval_mean = np.bincount(interval_groups, intervals, group_count) / safe_interval_counts
+    interval_var = (
+        np.bincount(interval_groups, intervals ** 2, group_count) / safe_interval_counts
+        - interval_mean ** 2
+    )
+    interval_std = np.sqrt(np.clip(interval_var, 0, None))
+    interval_dispersion = np.divide(
+        interval_std, interval_mean,
+        out=np.full(group_count, np.inf), where=interval_mean > 0
+    )
+    
+    # Median: sort intervals by (group, value) and pick the middle of each run
+    interval_median = np.zeros(group_count)
+    if len(intervals):
+        sorted_intervals = intervals[np.lexsort((intervals, interval_groups))]
+        starts = np.concatenate(([0], np.cumsum(interval_counts)[:-1]))
+        lower_mid = np.where(has_intervals, starts + (interval_counts - 1) // 2, 0)
+        upper_mid = np.where(has_intervals, starts + interval_counts // 2, 0)
+        interval_median = np.where(
+            has_intervals, (sorted_intervals[lower_mid] + sorted_intervals[upper_mid]) / 2, 0
+        )
+    
+    safe_counts = np.where(counts > 0, counts, 1)
+    amount_mean = np.bincount(row_groups, amounts, group_count) / safe_counts
+    amount_var = np.bincount(row_groups, amounts ** 2, group_count) / safe_counts - amount_mean ** 2
+    amount_cv = np.divide(
+        np.sqrt(np.clip(amount_var, 0, None)), np.abs(amount_mean),
+        out=np.full(group_count, np.inf), where=amount_mean != 0
+    )
+    amount_stability = 1 / (1 + amount_cv)
+    
+    frequency = np.select(
+        [(interval_median >= low) & (interval_median <= high) for _, low, high in RECURRING_FREQUENCIES],
+        [name for name, _, _ in RECURRING_FREQUENCIES],
+        default=''
+    )
+    is_recurring = (
+        has_intervals
+        & (frequency != '')
+        & (interval_dispersion <= MAX_INTERVAL_DISPERSION)
+        & (amount_stability >= MIN_AMOUNT_STABILITY)
+    )
+    
+    last_date = np.zeros(group_count, dtype=np.int64)
+    if len(dates):
+        last_date = np.where(counts > 0, dates[np.maximum(offsets[1:] - 1, 0)], 0)
+    next_expected = last_date + np.rint(interval_median).astype(np.int64)
+    
+    return {
+        'count': counts,
+        'interval_mean': interval_mean,
+        'interval_median': interval_median,
+        'interval_dispersion': interval_dispersion,
+        'amount_mean': amount_mean,
+        'amount_stability': amount_stability,
+        'last_date': last_date,
+        'next_expected': next_expected,
+        'frequency': frequency,
+        'is_recurring': is_recurring,
+    }
@@ -0,0 +1,129 @@
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Sum, Count, F, Q
+from django.db.models.functions import ExtractYear, ExtractMonth
+
+from .models import Transaction, MonthlyRollup
+
+
+def rollup_key(user_id, tx_date, category_id, transaction_type):
+    return (user_id, tx_date.year, tx_date.month, category_id, transaction_type)
+
+
+def add_transaction_delta(deltas, transaction, sign=1):
+    tx_date = transaction.date
+    if isinstance(tx_date, str):
+        tx_date = date.fromisoformat(tx_date)
+    key = rollup_key(
+        transaction.user_id, tx_date, transaction.category_id, transaction.transaction_type
+    )
+    total, count = deltas[key]
+    deltas[key] = (total + sign * Decimal(str(transaction.amount)), count + sign)
+
+
+def new_deltas():
+    return defaultdict(lambda: (0, 0))
+
+
+def apply_rollup_deltas(deltas, create=True):
+    """Add (amount, count) deltas to their rollup rows, creating rows as needed"""
+    for (user_id, year, month, category_id, transaction_type), (total, count) in deltas.items():
+        if not total and not count:
+            continue
+        
+        lookup = {
+            'user_id': user_id,
+            'year': year,
+            'month': month,
+            'category_id': category_id,
+            'transaction_type': transaction_type,
+        }
+        rollups = MonthlyRollup.objects.filter(**lookup)
+        if rollups.update(total=F('total') + total, count=F('count') + count) or not create:
+            continue
+        
+        try:
+            with db_transaction.atomic():
+                MonthlyRollup.objects.create(total=total, count=count, **lookup)
+        except IntegrityError:
+            # Created concurrently between the update and the insert
+            rollups.update(total=F('total') + total, count=F('count') + count)
+
+
+def recategorize_rollups(queryset, category_id):
+    """Move the rollup totals of ``queryset`` to ``category_id`` ahead of a bulk update"""
+    deltas = new_deltas()
+    rows = queryset.order_by().annotate(
+        year=ExtractYear('date'), month=ExtractMonth('date')
+    ).values('user_id', 'year', 'month', 'category_id', 'transaction_type').annotate(
+        total=Sum('amount'), count=Count('id')
+    )
+    for row in rows:
+        if row['category_id'] == category_id:
+            continue
+        for key_category, sign in ((row['category_id'], -1), (category_id, 1)):
+            key = (row['user_id'], row['year'], row['month'], key_category, row['transaction_type'])
+            total, count = deltas[key]
+            deltas[key] = (total + sign * row['total'], count + sign * row['count'])
+    apply_rollup_deltas(deltas)
+
+
+def rebuild_rollups(user_id=None):
+    """Recompute rollups from raw transactions, for one user or everyone"""
+    transactions = Transaction.objects.all()
+    rollups = MonthlyRollup.objects.all()
+    if user_id is not None:
+        transactions = transactions.filter(user_id=user_id)
+        rollups = rollups.filter(user_id=user_id)
+    
+    rows = transactions.order_by().annotate(
+        year=ExtractYear('date'), month=ExtractMonth('date')
+    ).values('user_id', 'year', 'month', 'category_id', 'transaction_type').annotate(
+        total=Sum('amount'), count=Count('id')
+    )
+    
+    with db_transaction.atomic():
+        rollups.delete()
+        created = MonthlyRollup.objects.bulk_create(
+            (MonthlyRollup(**row) for row in rows.iterator()), batch_size=1000
+        )
+    return len(created)
+
+
+def whole_month_span(start_date=None, end_date=None):
+    """(start, end) as (year, month) pairs if the range covers whole months, else None.
+
+    An open end counts as aligned. Unparseable dates return None so callers
+    fall back to querying transactions directly.
+    """
+    try:
+        if isinstance(start_date, str):
+            start_date = date.fromisoformat(start_date)
+        if isinstance(end_date, str):
+            end_date = date.fromisoformat(end_date)
+    except ValueError:
+        return None
+    
+    if start_date and start_date.day != 1:
+        return None
+    if end_date and end_date.day != monthrange(end_date.year, end_date.month)[1]:
+        return None
+    
+    return (
+        (start_date.year, start_date.month) if start_date else None,
+        (end_date.year, end_date.month) if end_date else None,
+    )
+
+
+def rollups_for_span(user, span):
+    start, end = span
+    rollups = MonthlyRollup.objects.filter(user=user)
+    if start:
+        rollups = rollups.filter(Q(year__gt=start[0]) | Q(year=start[0], month__gte=start[1]))
+    if end:
+        rollups = rollups.filter(Q(year__lt=end[0]) | Q(year=end[0], month__lte=end[1]))
+    return rollups
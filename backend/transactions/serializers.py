@@ -52,15 +52,19 @@ class TransactionBulkUpdateSerializer(serializers.Serializer):
 
 
 class StatementUploadSerializer(serializers.ModelSerializer):
+    progress_percent = serializers.FloatField(read_only=True)
+
     class Meta:
         model = StatementUpload
         fields = [
             'id', 'file', 'original_filename', 'file_type', 'status',
-            'transactions_count', 'error_message', 'created_at', 'processed_at'
+            'transactions_count', 'rows_total', 'rows_processed', 'progress_percent',
+            'error_message', 'created_at', 'processed_at'
         ]
         read_only_fields = [
             'id', 'original_filename', 'file_type', 'status',
-            'transactions_count', 'error_message', 'created_at', 'processed_at'
+            'transactions_count', 'rows_total', 'rows_processed',
+            'error_message', 'created_at', 'processed_at'
         ]
 
 
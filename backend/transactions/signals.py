@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from .models import Category, Transaction, MonthlyRollup
+from .category_cache import category_resolver
+from .rollups import new_deltas, add_transaction_delta, apply_rollup_deltas
+
+
+ROLLUP_FIELDS = ('user_id', 'date', 'amount', 'transaction_type', 'category_id')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    """Drop cached categories so the next lookup reloads them"""
+    if instance.is_system or instance.user_id is None:
+        category_resolver.invalidate()
+    else:
+        category_resolver.invalidate(instance.user_id)
+
+
+def _deleting_user(origin):
+    # Account deletion cascades to the user's rollups, nothing to maintain
+    return isinstance(origin, get_user_model())
+
+
+@receiver(pre_delete, sender=Category)
+def move_category_rollups_to_uncategorized(sender, instance, origin=None, **kwargs):
+    """Transactions fall back to no category, so their rollup totals do too"""
+    if _deleting_user(origin):
+        return
+    
+    deltas = new_deltas()
+    for rollup in MonthlyRollup.objects.filter(category=instance):
+        key = (rollup.user_id, rollup.year, rollup.month, None, rollup.transaction_type)
+        total, count = deltas[key]
+        deltas[key] = (total + rollup.total, count + rollup.count)
+    apply_rollup_deltas(deltas)
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_rollup_fields(sender, instance, update_fields=None, **kwargs):
+    instance._rollup_previous = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {'user', 'date', 'amount', 'transaction_type', 'category'} & set(update_fields):
+        return
+    previous = Transaction.objects.filter(pk=instance.pk).values(*ROLLUP_FIELDS).first()
+    if previous:
+        instance._rollup_previous = SimpleNamespace(**previous)
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollups_on_save(sender, instance, created, update_fields=None, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if not created and previous is None:
+        return
+    
+    deltas = new_deltas()
+    if previous is not None:
+        add_transaction_delta(deltas, previous, sign=-1)
+    add_transaction_delta(deltas, instance)
+    apply_rollup_deltas(deltas)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollups_on_delete(sender, instance, origin=None, **kwargs):
+    if _deleting_user(origin):
+        return
+    
+    deltas = new_deltas()
+    add_transaction_delta(deltas, instance, sign=-1)
+    apply_rollup_deltas(deltas, create=False)
@@ -1,17 +1,55 @@
 import csv
-import io
 import hashlib
-from datetime import datetime
+import logging
+import re
+from datetime import date as date_cls, datetime
+from functools import lru_cache
 from decimal import Decimal
+from itertools import islice
+import numpy as np
+from billiard import Pool
+from billiard.exceptions import WorkerLostError
 from celery import shared_task
+from django.conf import settings
+from django.db import transaction as db_transaction
 from django.utils import timezone
 import pdfplumber
+from .normalization import extract_merchant_name, normalize_description
+from .recurring import analyze_intervals, flatten_groups
+
+
+logger = logging.getLogger(__name__)
+
+
+DATE_FORMATS = [
+    '%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d', '%d/%m/%Y',
+    '%b %d, %Y', '%B %d, %Y', '%d-%m-%Y', '%Y/%m/%d'
+]
+
+# Rows inspected before a statement's date format is locked in
+DATE_FORMAT_SAMPLE_SIZE = 20
+
+LINE_DATE_PATTERNS = [
+    re.compile(r'(\d{1,2}/\d{1,2}/\d{2,4})'),
+    re.compile(r'(\d{4}-\d{2}-\d{2})'),
+    re.compile(r'(\w{3}\s+\d{1,2},?\s+\d{4})'),
+]
+LINE_AMOUNT_PATTERN = re.compile(r'\$?([\d,]+\.?\d{0,2})')
+CREDIT_KEYWORDS = ['deposit', 'credit', 'payment received']
+
+_NUMERIC_DIRECTIVES = {
+    '%d': ('day', r'(\d{1,2})'),
+    '%m': ('month', r'(\d{1,2})'),
+    '%Y': ('year', r'(\d{4})'),
+    '%y': ('short_year', r'(\d{2})'),
+}
+_DIRECTIVE_PATTERN = re.compile(r'%[a-zA-Z]')
 
 
 @shared_task(bind=True, max_retries=3)
 def process_statement_upload(self, upload_id):
-    from .models import StatementUpload, Transaction, Category
-    from ml_engine.classifier import TransactionClassifier
+    from .models import StatementUpload
+    from ml_engine.registry import model_registry
     
     try:
         upload = StatementUpload.objects.get(id=upload_id)
@@ -19,58 +57,33 @@ def process_statement_upload(self, upload_id):
         upload.save()
         
         if upload.file_type == 'csv':
+            # Raw records are counted without parsing them, once per upload;
+            # rows the parser skips make this an upper bound
+            if upload.rows_total is None:
+                upload.rows_total = count_csv_records(upload.file.path)
+                upload.save(update_fields=['rows_total'])
             transactions_data = parse_csv_statement(upload.file.path)
         elif upload.file_type == 'pdf':
-            transactions_data = parse_pdf_statement(upload.file.path)
+            # Extraction is done before ingestion starts; classifying and
+            # inserting the rows is the long part, so count them for progress
+            transactions_data = list(parse_pdf_statement(upload.file.path))
+            if upload.rows_total is None:
+                upload.rows_total = len(transactions_data)
+                upload.save(update_fields=['rows_total'])
         else:
             raise ValueError(f"Unsupported file type: {upload.file_type}")
         
-        classifier = TransactionClassifier()
-        classifier.load_model()
+        classifier = model_registry.get_classifier()
         
-        created_count = 0
-        for tx_data in transactions_data:
-            hash_input = f"{upload.user_id}:{tx_data['date']}:{tx_data['description']}:{tx_data['amount']}:{tx_data['transaction_type']}"
-            idempotency_hash = hashlib.sha256(hash_input.encode()).hexdigest()
-            
-            if Transaction.objects.filter(idempotency_hash=idempotency_hash).exists():
-                continue
-            
-            category = None
-            ml_category = None
-            ml_confidence = None
-            
-            if classifier.is_loaded:
-                predicted_category, confidence = classifier.predict(tx_data['description'])
-                if predicted_category:
-                    ml_category = Category.objects.filter(
-                        name__iexact=predicted_category,
-                        is_system=True
-                    ).first()
-                    ml_confidence = confidence
-                    if confidence > 0.7:
-                        category = ml_category
-            
-            Transaction.objects.create(
-                user=upload.user,
-                date=tx_data['date'],
-                description=tx_data['description'],
-                amount=tx_data['amount'],
-                transaction_type=tx_data['transaction_type'],
-                category=category,
-                ml_category=ml_category,
-                ml_confidence=ml_confidence,
-                source_file=upload,
-                idempotency_hash=idempotency_hash
-            )
-            created_count += 1
+        created_count = ingest_transactions(upload, transactions_data, classifier)
         
         upload.status = 'completed'
+        upload.rows_total = upload.rows_processed
         upload.transactions_count = created_count
         upload.processed_at = timezone.now()
         upload.save()
         
-        detect_recurring_patterns.delay(str(upload.user_id))
+        detect_recurring_patterns.delay(str(upload.user_id), str(upload.id))
         
         return {'status': 'success', 'transactions_created': created_count}
         
@@ -81,18 +94,133 @@ def process_statement_upload(self, upload_id):
         raise self.retry(exc=e, countdown=60)
 
 
-def parse_csv_statement(file_path):
-    transactions = []
+def build_idempotency_hash(user_id, tx_data):
+    hash_input = f"{user_id}:{tx_data['date']}:{tx_data['description']}:{tx_data['amount']}:{tx_data['transaction_type']}"
+    return hashlib.sha256(hash_input.encode()).hexdigest()
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ingest_transactions(upload, transactions_data, classifier, chunk_size=None):
+    """Insert parsed rows in chunks, skipping rows that were already imported.
+
+    ``transactions_data`` may be any iterable (the statement parsers are
+    generators), so only one chunk of rows is held in memory at a time.
+    Each chunk commits together with the upload's checkpoint
+    (``rows_processed``), and a retried upload skips the rows before it.
+    Returns the total number of transactions created for the upload.
+    """
+    from .models import StatementUpload
+    
+    chunk_size = chunk_size or settings.STATEMENT_IMPORT_CHUNK_SIZE
+    remaining_rows = islice(transactions_data, upload.rows_processed, None)
+    
+    for chunk in chunked(remaining_rows, chunk_size):
+        hashed_rows = [
+            (build_idempotency_hash(upload.user_id, tx_data), tx_data)
+            for tx_data in chunk
+        ]
+        with db_transaction.atomic():
+            created = _ingest_chunk(upload, hashed_rows, classifier)
+            StatementUpload.objects.filter(pk=upload.pk).update(
+                rows_processed=upload.rows_processed + len(chunk),
+                transactions_count=upload.transactions_count + created
+            )
+        upload.rows_processed += len(chunk)
+        upload.transactions_count += created
+    
+    return upload.transactions_count
+
+
+def _ingest_chunk(upload, hashed_rows, classifier):
+    from .models import Transaction
+    from .category_cache import category_resolver
+    from .rollups import new_deltas, add_transaction_delta, apply_rollup_deltas
+    
+    existing = set(
+        Transaction.objects.filter(
+            idempotency_hash__in=[h for h, _ in hashed_rows]
+        ).values_list('idempotency_hash', flat=True)
+    )
+    
+    new_rows = []
+    for idempotency_hash, tx_data in hashed_rows:
+        if idempotency_hash in existing:
+            continue
+        existing.add(idempotency_hash)
+        new_rows.append((idempotency_hash, tx_data))
     
-    with open(file_path, 'r', encoding='utf-8-sig') as f:
-        content = f.read()
+    if classifier.is_loaded:
+        predictions = classifier.predict_batch([tx_data['description'] for _, tx_data in new_rows])
+    else:
+        predictions = [(None, None)] * len(new_rows)
     
-    lines = content.strip().split('\n')
-    if not lines:
-        return transactions
+    new_transactions = []
+    for (idempotency_hash, tx_data), (predicted_category, confidence) in zip(new_rows, predictions):
+        category = None
+        ml_category = None
+        ml_confidence = None
+        
+        if predicted_category:
+            ml_category = category_resolver.system_category(predicted_category)
+            ml_confidence = confidence
+            if confidence > 0.7:
+                category = ml_category
+        
+        new_transactions.append(Transaction(
+            user_id=upload.user_id,
+            date=tx_data['date'],
+            description=tx_data['description'],
+            amount=tx_data['amount'],
+            transaction_type=tx_data['transaction_type'],
+            category=category,
+            ml_category=ml_category,
+            ml_confidence=ml_confidence,
+            source_file=upload,
+            idempotency_hash=idempotency_hash
+        ))
+    
+    Transaction.objects.bulk_create(new_transactions, ignore_conflicts=True)
+    
+    # ignore_conflicts drops rows a concurrent import inserted first, so count
+    # and roll up only the rows that were stored for this upload
+    inserted = Transaction.objects.filter(
+        idempotency_hash__in=[tx.idempotency_hash for tx in new_transactions],
+        source_file=upload
+    ).only('user_id', 'date', 'amount', 'transaction_type', 'category_id')
     
-    reader = csv.DictReader(io.StringIO(content))
+    # bulk_create skips model signals, so rollups are updated for the batch here
+    deltas = new_deltas()
+    created = 0
+    for tx in inserted:
+        add_transaction_delta(deltas, tx)
+        created += 1
+    apply_rollup_deltas(deltas)
     
+    return created
+
+
+def count_csv_records(file_path):
+    """Number of non-empty records after the header of a CSV statement, without parsing them"""
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        return max(sum(1 for record in csv.reader(f) if record) - 1, 0)
+
+
+def parse_csv_statement(file_path):
+    """Yield normalized rows from a CSV statement, reading the file incrementally"""
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        yield from _parse_csv_rows(reader)
+
+
+def _parse_csv_rows(reader):
     date_columns = ['date', 'transaction_date', 'posted_date', 'Date', 'Transaction Date']
     desc_columns = ['description', 'memo', 'name', 'merchant', 'Description', 'Memo', 'Name']
     amount_columns = ['amount', 'Amount', 'Value']
@@ -107,10 +235,17 @@ def parse_csv_statement(file_path):
     debit_col = next((c for c in fieldnames if c in debit_columns), None)
     credit_col = next((c for c in fieldnames if c in credit_columns), None)
     
+    date_parser = DateParser()
+    yield from date_parser.resolve(_parse_csv_records(
+        reader, date_parser, date_col, desc_col, amount_col, debit_col, credit_col
+    ))
+
+
+def _parse_csv_records(reader, date_parser, date_col, desc_col, amount_col, debit_col, credit_col):
     for row in reader:
         try:
-            date_str = row.get(date_col, '')
-            date = parse_date(date_str)
+            date_str = row.get(date_col, '') or ''
+            date = date_parser.parse(date_str)
             if not date:
                 continue
             
@@ -138,57 +273,103 @@ def parse_csv_statement(file_path):
             else:
                 continue
             
-            transactions.append({
+            yield date_str, {
                 'date': date,
                 'description': description.strip(),
                 'amount': amount,
                 'transaction_type': transaction_type
-            })
+            }
         except (ValueError, KeyError):
             continue
-    
-    return transactions
 
 
-def parse_pdf_statement(file_path):
-    transactions = []
+def parse_pdf_statement(file_path, workers=None):
+    """Yield rows from a PDF statement.
+
+    Page text extraction is the slow part, so statements with at least
+    STATEMENT_PDF_PARALLEL_MIN_PAGES pages have their page ranges extracted
+    in a billiard process pool. Lines are still parsed here, in page order, so date
+    format detection sees the statement exactly as in the serial path.
+    """
+    if workers is None:
+        workers = settings.STATEMENT_PDF_WORKERS
+    
+    page_texts = None
+    if workers > 1:
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+        if page_count >= settings.STATEMENT_PDF_PARALLEL_MIN_PAGES:
+            page_texts = _extract_pdf_text_parallel(file_path, page_count, workers)
+    
+    if page_texts is None:
+        page_texts = _iter_pdf_page_text(file_path)
     
+    date_parser = DateParser()
+    yield from date_parser.resolve(_extract_page_transactions(page_texts, date_parser.parse))
+
+
+def _extract_page_transactions(page_texts, parse):
+    for text in page_texts:
+        for line in text.split('\n'):
+            extracted = _extract_line_transaction(line, parse)
+            if extracted:
+                yield extracted
+
+
+def _iter_pdf_page_text(file_path):
     with pdfplumber.open(file_path) as pdf:
         for page in pdf.pages:
-            text = page.extract_text() or ''
-            lines = text.split('\n')
-            
-            for line in lines:
-                tx = extract_transaction_from_line(line)
-                if tx:
-                    transactions.append(tx)
-    
-    return transactions
+            yield page.extract_text() or ''
 
 
-def extract_transaction_from_line(line):
-    import re
-    
-    date_patterns = [
-        r'(\d{1,2}/\d{1,2}/\d{2,4})',
-        r'(\d{4}-\d{2}-\d{2})',
-        r'(\w{3}\s+\d{1,2},?\s+\d{4})',
-    ]
+def _extract_pdf_page_range(file_path, start, end):
+    with pdfplumber.open(file_path) as pdf:
+        return [page.extract_text() or '' for page in pdf.pages[start:end]]
+
+
+def _extract_pdf_text_parallel(file_path, page_count, workers):
+    workers = min(workers, page_count)
+    step = -(-page_count // workers)
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
     
-    amount_pattern = r'\$?([\d,]+\.?\d{0,2})'
+    # billiard rather than multiprocessing: prefork Celery workers are
+    # daemonic, and only billiard lets them start child processes
+    try:
+        with Pool(processes=len(ranges)) as pool:
+            results = pool.starmap(
+                _extract_pdf_page_range,
+                [(file_path, start, end) for start, end in ranges],
+            )
+    except (OSError, WorkerLostError) as exc:
+        logger.warning(
+            'Parallel extraction of %s failed, extracting its %d pages serially: %s',
+            file_path, page_count, exc
+        )
+        return None
     
+    return [text for page_range in results for text in page_range]
+
+
+def extract_transaction_from_line(line, date_parser=None):
+    extracted = _extract_line_transaction(line, date_parser.parse if date_parser else parse_date)
+    return extracted[1] if extracted else None
+
+
+def _extract_line_transaction(line, parse):
+    """Return (date string, row) for a statement line, or None"""
     date = None
-    for pattern in date_patterns:
-        match = re.search(pattern, line)
+    for pattern in LINE_DATE_PATTERNS:
+        match = pattern.search(line)
         if match:
-            date = parse_date(match.group(1))
+            date_str = match.group(1)
+            date = parse(date_str)
             if date:
                 break
     
     if not date:
         return None
     
-    amounts = re.findall(amount_pattern, line)
+    amounts = LINE_AMOUNT_PATTERN.findall(line)
     if not amounts:
         return None
     
@@ -198,17 +379,18 @@ def extract_transaction_from_line(line):
     except:
         return None
     
-    description = re.sub(r'\$?[\d,]+\.?\d{0,2}', '', line)
-    for pattern in date_patterns:
-        description = re.sub(pattern, '', description)
+    description = LINE_AMOUNT_PATTERN.sub('', line)
+    for pattern in LINE_DATE_PATTERNS:
+        description = pattern.sub('', description)
     description = ' '.join(description.split()).strip()
     
     if len(description) < 3:
         return None
     
-    transaction_type = 'credit' if any(word in line.lower() for word in ['deposit', 'credit', 'payment received']) else 'debit'
+    lowered = line.lower()
+    transaction_type = 'credit' if any(word in lowered for word in CREDIT_KEYWORDS) else 'debit'
     
-    return {
+    return date_str, {
         'date': date,
         'description': description,
         'amount': amount,
@@ -217,12 +399,7 @@ def extract_transaction_from_line(line):
 
 
 def parse_date(date_str):
-    formats = [
-        '%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d', '%d/%m/%Y',
-        '%b %d, %Y', '%B %d, %Y', '%d-%m-%Y', '%Y/%m/%d'
-    ]
-    
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(date_str.strip(), fmt).date()
         except ValueError:
@@ -231,88 +408,231 @@ def parse_date(date_str):
     return None
 
 
-@shared_task
-def detect_recurring_patterns(user_id):
-    from .models import Transaction, RecurringPattern
-    from django.db.models import Avg, Count
-    from collections import defaultdict
-    import re
+@lru_cache(maxsize=None)
+def compile_date_format(fmt):
+    """Build a fast parser for ``fmt``.
+
+    Purely numeric formats are matched with a precompiled regex and turned
+    into a date directly; anything else (month names) goes through strptime.
+    """
+    directives = _DIRECTIVE_PATTERN.findall(fmt)
+    if not all(d in _NUMERIC_DIRECTIVES for d in directives):
+        def parse_with_strptime(date_str):
+            try:
+                return datetime.strptime(date_str, fmt).date()
+            except ValueError:
+                return None
+        return parse_with_strptime
     
-    transactions = Transaction.objects.filter(
-        user_id=user_id,
-        transaction_type='debit'
-    ).order_by('date')
+    fields = [_NUMERIC_DIRECTIVES[d][0] for d in directives]
+    regex = ''
+    for part in re.split(r'(%[a-zA-Z])', fmt):
+        regex += _NUMERIC_DIRECTIVES[part][1] if part in _NUMERIC_DIRECTIVES else re.escape(part)
+    pattern = re.compile(regex + r'\Z')
     
-    grouped = defaultdict(list)
-    for tx in transactions:
-        normalized = normalize_description(tx.description)
-        grouped[normalized].append(tx)
+    def parse_numeric(date_str):
+        match = pattern.match(date_str)
+        if not match:
+            return None
+        values = dict(zip(fields, map(int, match.groups())))
+        if 'short_year' in values:
+            # Same pivot as strptime's %y: 69-99 -> 1900s, 00-68 -> 2000s
+            short_year = values['short_year']
+            values['year'] = short_year + (1900 if short_year >= 69 else 2000)
+        try:
+            return date_cls(values['year'], values['month'], values['day'])
+        except ValueError:
+            return None
     
-    for pattern, txs in grouped.items():
-        if len(txs) < 2:
-            continue
-        
-        dates = sorted([tx.date for tx in txs])
-        intervals = [(dates[i+1] - dates[i]).days for i in range(len(dates)-1)]
-        
-        if not intervals:
-            continue
-        
-        avg_interval = sum(intervals) / len(intervals)
+    return parse_numeric
+
+
+class DateParser:
+    """Parses one statement's dates, locking onto its format after a few rows.
+
+    While sampling, every candidate format is tried and formats that fail a
+    row are dropped, which also settles day/month ambiguity from rows such
+    as 25/01/2024. Once a single format remains (or enough rows agree) each
+    date costs one precompiled match, falling back to ``parse_date`` for
+    the odd row that does not fit.
+
+    ``parse`` on its own returns a provisional date while sampling; the
+    statement parsers go through ``resolve`` so sampled rows are re-parsed
+    in the format the statement settles on.
+    """
+
+    def __init__(self, sample_size=DATE_FORMAT_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self.candidates = list(DATE_FORMATS)
+        self.samples = 0
+        self.format = None
+        self._fast_parse = None
+
+    def parse(self, date_str):
+        date_str = date_str.strip()
         
-        frequency = None
-        if 5 <= avg_interval <= 9:
-            frequency = 'weekly'
-        elif 12 <= avg_interval <= 16:
-            frequency = 'biweekly'
-        elif 25 <= avg_interval <= 35:
-            frequency = 'monthly'
-        elif 85 <= avg_interval <= 100:
-            frequency = 'quarterly'
-        elif 350 <= avg_interval <= 380:
-            frequency = 'yearly'
+        if self._fast_parse is not None:
+            return self._fast_parse(date_str) or parse_date(date_str)
         
-        if not frequency:
-            continue
+        parsed = [
+            (fmt, result) for fmt, result in (
+                (fmt, compile_date_format(fmt)(date_str)) for fmt in self.candidates
+            ) if result
+        ]
+        if not parsed:
+            return parse_date(date_str)
         
-        avg_amount = sum(tx.amount for tx in txs) / len(txs)
+        self.candidates = [fmt for fmt, _ in parsed]
+        self.samples += 1
+        if len(self.candidates) == 1 or self.samples >= self.sample_size:
+            self.format = self.candidates[0]
+            self._fast_parse = compile_date_format(self.format)
         
-        RecurringPattern.objects.update_or_create(
-            user_id=user_id,
-            description_pattern=pattern,
-            defaults={
-                'merchant_name': extract_merchant_name(pattern),
-                'average_amount': avg_amount,
-                'frequency': frequency,
-                'category': txs[0].category,
-                'last_occurrence': dates[-1],
-                'is_active': True
-            }
-        )
+        return parsed[0][1]
+
+    def decide(self):
+        """Lock onto the first remaining candidate if sampling has not settled it"""
+        if self._fast_parse is None:
+            self.format = self.candidates[0]
+            self._fast_parse = compile_date_format(self.format)
+
+    def resolve(self, records):
+        """Yield rows from (date string, row) pairs parsed with this parser.
+
+        Rows read while the format is still being sampled are held back and
+        their dates re-parsed once it is decided (or the statement ends), so
+        a statement never mixes day-first and month-first dates.
+        """
+        pending = []
+        for date_str, row in records:
+            if self._fast_parse is None:
+                pending.append((date_str, row))
+                continue
+            if pending:
+                yield from self._reparse(pending)
+                pending = []
+            yield row
         
-        Transaction.objects.filter(id__in=[tx.id for tx in txs]).update(
-            is_recurring=True,
-            recurring_group=pattern
-        )
+        if pending:
+            self.decide()
+            yield from self._reparse(pending)
 
+    def _reparse(self, pending):
+        for date_str, row in pending:
+            row['date'] = self.parse(date_str)
+            yield row
 
-def normalize_description(description):
-    import re
+
+@shared_task
+def detect_recurring_patterns(user_id, upload_id=None):
+    """Detect recurring debits; with ``upload_id`` only the merchants in that upload are re-evaluated"""
+    from .models import Transaction
+    from collections import defaultdict
+    from datetime import timedelta
+    
+    debits = Transaction.objects.filter(user_id=user_id, transaction_type='debit')
+    
+    touched = None
+    if upload_id:
+        uploaded = list(debits.filter(source_file_id=upload_id).values_list('description', 'date'))
+        if not uploaded:
+            return
+        touched = {normalize_description(description) for description, _ in uploaded}
+        earliest = min(tx_date for _, tx_date in uploaded)
+        debits = debits.filter(
+            date__gte=earliest - timedelta(days=settings.RECURRING_HISTORY_DAYS)
+        )
+    
+    rows = debits.order_by('date').values_list(
+        'id', 'date', 'amount', 'description', 'category_id', 'is_recurring', 'recurring_group'
+    )
     
-    text = description.lower()
-    text = re.sub(r'\d{4,}', '', text)
-    text = re.sub(r'#\d+', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = text.strip()
+    grouped = defaultdict(list)
+    for row in rows.iterator(chunk_size=2000):
+        pattern = normalize_description(row[3])
+        if touched is None or pattern in touched:
+            grouped[pattern].append(row)
+    
+    candidates = [(pattern, txs) for pattern, txs in grouped.items() if len(txs) >= 2]
+    if not candidates:
+        return
+    
+    stats = analyze_intervals(*flatten_groups([
+        [(tx[1], tx[2]) for tx in txs] for _, txs in candidates
+    ]))
+    
+    detected = {}
+    for index in np.flatnonzero(stats['is_recurring']):
+        pattern, txs = candidates[index]
+        detected[pattern] = (txs, {
+            'frequency': str(stats['frequency'][index]),
+            'average_amount': Decimal(f"{stats['amount_mean'][index]:.2f}"),
+            'next_expected': date_cls.fromordinal(int(stats['next_expected'][index])),
+        })
     
-    return text[:50] if text else description[:50].lower()
+    if detected:
+        save_recurring_patterns(user_id, detected)
 
 
-def extract_merchant_name(description):
-    parts = description.split()
-    if parts:
-        return ' '.join(parts[:3]).title()
-    return description.title()
+def save_recurring_patterns(user_id, detected):
+    """Upsert RecurringPattern rows and flag their transactions in bulk.
+    
+    ``detected`` maps description pattern to (rows, stats) where rows are
+    date-ordered (id, date, amount, description, category_id, is_recurring,
+    recurring_group) tuples and stats holds frequency, average_amount and
+    next_expected.
+    """
+    from .models import Transaction, RecurringPattern
+    from collections import defaultdict
+    from django.db.models import Case, Value, When
+    
+    existing = {}
+    for recurring in RecurringPattern.objects.filter(
+        user_id=user_id, description_pattern__in=list(detected)
+    ).order_by('created_at'):
+        existing.setdefault(recurring.description_pattern, recurring)
+    
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    flagged = []
+    for pattern, (txs, pattern_stats) in detected.items():
+        values = {
+            'merchant_name': extract_merchant_name(pattern),
+            'category_id': txs[0][4],
+            'last_occurrence': txs[-1][1],
+            'is_active': True,
+            **pattern_stats,
+        }
+        
+        recurring = existing.get(pattern)
+        if recurring is None:
+            to_create.append(RecurringPattern(user_id=user_id, description_pattern=pattern, **values))
+        else:
+            for field, value in values.items():
+                setattr(recurring, field, value)
+            recurring.updated_at = now
+            to_update.append(recurring)
+        
+        flagged.extend((tx[0], pattern) for tx in txs if not (tx[5] and tx[6] == pattern))
+    
+    with db_transaction.atomic():
+        RecurringPattern.objects.bulk_create(to_create)
+        RecurringPattern.objects.bulk_update(to_update, [
+            'merchant_name', 'average_amount', 'frequency', 'category',
+            'last_occurrence', 'next_expected', 'is_active', 'updated_at',
+        ], batch_size=500)
+        # One UPDATE per batch, with a CASE branch per pattern rather than per row
+        for batch in chunked(flagged, 1000):
+            by_pattern = defaultdict(list)
+            for tx_id, pattern in batch:
+                by_pattern[pattern].append(tx_id)
+            Transaction.objects.filter(id__in=[tx_id for tx_id, _ in batch]).update(
+                is_recurring=True,
+                recurring_group=Case(*[
+                    When(id__in=ids, then=Value(pattern)) for pattern, ids in by_pattern.items()
+                ]),
+            )
 
 
 @shared_task
@@ -1,3 +1,456 @@
-from django.test import TestCase
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from .aggregation import summarize_transactions
+from .category_cache import CategoryResolver, category_resolver
+from .models import Category, MonthlyRollup, StatementUpload, Transaction
+from .recurring import (
+    MAX_INTERVAL_DISPERSION, MIN_AMOUNT_STABILITY, analyze_intervals, flatten_groups
+)
+from .rollups import rebuild_rollups
+from .tasks import (
+    DATE_FORMATS, DateParser, build_idempotency_hash, compile_date_format, ingest_transactions,
+    count_csv_records, parse_csv_statement, parse_pdf_statement, process_statement_upload,
+    _extract_pdf_text_parallel
+)
+
+
+def make_user(email='user@example.com'):
+    return User.objects.create_user(email=email, username=email, password='test-pass-123')
+
+
+class StatementUploadViewTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.content = b'Date,Description,Amount\n01/02/2024,COFFEE SHOP,-4.50\n'
+
+    def post_statement(self):
+        upload = SimpleUploadedFile('statement.csv', self.content, content_type='text/csv')
+        return self.client.post('/api/transactions/upload/', {'file': upload}, format='multipart')
+
+    @mock.patch('transactions.views.process_statement_upload.delay')
+    def test_upload_stores_hash_and_queues_processing(self, delay):
+        response = self.post_statement()
+        
+        self.assertEqual(response.status_code, 201)
+        upload = StatementUpload.objects.get(user=self.user)
+        self.assertEqual(upload.file_hash, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(upload.file_type, 'csv')
+        delay.assert_called_once_with(str(upload.id))
+
+    @mock.patch('transactions.views.process_statement_upload.delay')
+    def test_duplicate_upload_is_not_processed_again(self, delay):
+        self.post_statement()
+        response = self.post_statement()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StatementUpload.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(delay.call_count, 1)
+
+    def test_rejects_unsupported_file_type(self):
+        upload = SimpleUploadedFile('statement.txt', self.content)
+        response = self.client.post('/api/transactions/upload/', {'file': upload}, format='multipart')
+        
+        self.assertEqual(response.status_code, 400)
+
+
+class CategoryResolverTests(TestCase):
+    def setUp(self):
+        category_resolver.clear()
+        self.addCleanup(category_resolver.clear)
+        self.user = make_user()
+
+    def create_category_elsewhere(self, name):
+        # bulk_create skips post_save, like a category saved by another worker
+        return Category.objects.bulk_create([Category(name=name, user=self.user)])[0]
+
+    def test_by_id_loads_categories_missing_from_cache(self):
+        category_resolver.by_id(self.user.id)
+        category = self.create_category_elsewhere('Pets')
+        
+        self.assertNotIn(category.id, category_resolver.by_id(self.user.id))
+        self.assertIn(category.id, category_resolver.by_id(self.user.id, ids={category.id}))
+        self.assertEqual(category_resolver.by_id(self.user.id)[category.id], category)
+
+    def test_user_cache_evicts_least_recently_used(self):
+        resolver = CategoryResolver(max_users=2)
+        users = [make_user(f'user{i}@example.com') for i in range(3)]
+        
+        resolver.by_id(users[0].id)
+        resolver.by_id(users[1].id)
+        resolver.by_id(users[0].id)
+        resolver.by_id(users[2].id)
+        
+        self.assertEqual(list(resolver._users), [str(users[0].id), str(users[2].id)])
+
+    def test_summary_keeps_categories_created_after_cache_load(self):
+        category_resolver.by_id(self.user.id)
+        category = self.create_category_elsewhere('Pets')
+        Transaction.objects.create(
+            user=self.user, date=date(2024, 3, 5), description='VET CLINIC',
+            amount=Decimal('50.00'), transaction_type='debit', category=category
+        )
+        
+        summary = summarize_transactions(self.user)
+        
+        self.assertEqual(summary['expenses'], Decimal('50.00'))
+        self.assertEqual(
+            [(item['category__name'], item['total']) for item in summary['by_category']],
+            [('Pets', Decimal('50.00'))]
+        )
+
+
+class AnalyzeIntervalsTests(TestCase):
+    def analyze(self, *groups):
+        return analyze_intervals(*flatten_groups(list(groups)))
+
+    def every(self, days, count, amount=Decimal('9.99'), start=date(2024, 1, 1)):
+        return [(start + timedelta(days=days * i), amount) for i in range(count)]
+
+    def test_detects_frequency_per_group(self):
+        result = self.analyze(self.every(30, 4), self.every(7, 6), self.every(91, 3))
+        
+        self.assertEqual(list(result['frequency']), ['monthly', 'weekly', 'quarterly'])
+        self.assertTrue(result['is_recurring'].all())
+        self.assertEqual(list(result['count']), [4, 6, 3])
+
+    def test_next_expected_is_last_date_plus_median_interval(self):
+        dates = [date(2024, 1, 1), date(2024, 1, 29), date(2024, 3, 1), date(2024, 3, 31)]
+        result = self.analyze([(tx_date, Decimal('20')) for tx_date in dates])
+        
+        # Intervals 28, 32, 30
+        self.assertEqual(result['interval_median'][0], 30)
+        self.assertEqual(result['last_date'][0], date(2024, 3, 31).toordinal())
+        self.assertEqual(date.fromordinal(int(result['next_expected'][0])), date(2024, 4, 30))
+
+    def test_median_of_even_interval_count(self):
+        dates = [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 14), date(2024, 1, 24), date(2024, 2, 1)]
+        result = self.analyze([(tx_date, Decimal('5')) for tx_date in dates])
+        
+        # Intervals 7, 6, 10, 8
+        self.assertEqual(result['interval_median'][0], 7.5)
+
+    def test_rejects_irregular_intervals(self):
+        dates = [date(2024, 1, 1), date(2024, 1, 11), date(2024, 2, 10), date(2024, 3, 31)]
+        result = self.analyze([(tx_date, Decimal('10')) for tx_date in dates])
+        
+        # Intervals 10, 30, 50: the median looks monthly but the spread is too wide
+        self.assertEqual(result['frequency'][0], 'monthly')
+        self.assertGreater(result['interval_dispersion'][0], MAX_INTERVAL_DISPERSION)
+        self.assertFalse(result['is_recurring'][0])
+
+    def test_rejects_unstable_amounts(self):
+        amounts = ['1', '250', '3', '400']
+        group = [(tx_date, Decimal(amount)) for (tx_date, _), amount in zip(self.every(30, 4), amounts)]
+        result = self.analyze(group)
+        
+        self.assertLess(result['amount_stability'][0], MIN_AMOUNT_STABILITY)
+        self.assertFalse(result['is_recurring'][0])
+
+    def test_single_row_group_is_not_recurring(self):
+        result = self.analyze([(date(2024, 1, 1), Decimal('10'))], self.every(30, 3))
+        
+        self.assertEqual(result['frequency'][0], '')
+        self.assertEqual(list(result['is_recurring']), [False, True])
+        self.assertEqual(result['next_expected'][0], date(2024, 1, 1).toordinal())
+
+
+class RollupMaintenanceTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.food = Category.objects.create(name='Food', user=self.user)
+
+    def rollups(self):
+        return {
+            (r.year, r.month, r.category_id, r.transaction_type): (r.total, r.count)
+            for r in MonthlyRollup.objects.filter(user=self.user)
+            if r.count
+        }
+
+    def assertMatchesRebuild(self):
+        maintained = self.rollups()
+        rebuild_rollups(self.user.id)
+        self.assertEqual(maintained, self.rollups())
+
+    def add(self, tx_date, amount, transaction_type='debit', category=None):
+        return Transaction.objects.create(
+            user=self.user, date=tx_date, description=f'{transaction_type} {amount} {tx_date}',
+            amount=Decimal(amount), transaction_type=transaction_type, category=category
+        )
+
+    def test_create_update_and_delete_keep_rollups_in_step(self):
+        coffee = self.add(date(2024, 1, 5), '4.50', category=self.food)
+        self.add(date(2024, 1, 20), '10.00', category=self.food)
+        self.add(date(2024, 1, 31), '2000.00', transaction_type='credit')
+        self.assertEqual(self.rollups(), {
+            (2024, 1, self.food.id, 'debit'): (Decimal('14.50'), 2),
+            (2024, 1, None, 'credit'): (Decimal('2000.00'), 1),
+        })
+        
+        coffee.amount = Decimal('5.00')
+        coffee.date = date(2024, 2, 1)
+        coffee.category = None
+        coffee.save()
+        self.assertEqual(self.rollups(), {
+            (2024, 1, self.food.id, 'debit'): (Decimal('10.00'), 1),
+            (2024, 1, None, 'credit'): (Decimal('2000.00'), 1),
+            (2024, 2, None, 'debit'): (Decimal('5.00'), 1),
+        })
+        
+        coffee.delete()
+        self.assertMatchesRebuild()
+
+    def test_deleting_category_moves_totals_to_uncategorized(self):
+        self.add(date(2024, 1, 5), '4.50', category=self.food)
+        self.add(date(2024, 1, 6), '1.50')
+        
+        self.food.delete()
+        
+        self.assertEqual(self.rollups(), {(2024, 1, None, 'debit'): (Decimal('6.00'), 2)})
+        self.assertMatchesRebuild()
+
+
+class IngestTransactionsTests(TestCase):
+    classifier = SimpleNamespace(is_loaded=False)
+
+    def setUp(self):
+        self.user = make_user()
+        self.upload = StatementUpload.objects.create(
+            user=self.user, file='statements/test.csv', original_filename='test.csv',
+            file_type='csv', file_hash='0' * 64
+        )
+        self.rows = [
+            {'date': date(2024, 1, day), 'description': f'SHOP {day}',
+             'amount': Decimal('10.00'), 'transaction_type': 'debit'}
+            for day in range(1, 6)
+        ]
+
+    def test_counts_and_rolls_up_inserted_rows(self):
+        created = ingest_transactions(self.upload, self.rows, self.classifier, chunk_size=2)
+        
+        self.assertEqual(created, 5)
+        self.assertEqual(self.upload.transactions_count, 5)
+        rollup = MonthlyRollup.objects.get(user=self.user)
+        self.assertEqual((rollup.total, rollup.count), (Decimal('50.00'), 5))
+
+    def test_rows_inserted_concurrently_are_not_counted_twice(self):
+        # Another import stores one of the rows between the existence check and the insert
+        concurrent = self.rows[0]
+        bulk_create = Transaction.objects.bulk_create
+        
+        def racing_bulk_create(objs, **kwargs):
+            Transaction.objects.create(
+                user=self.user, idempotency_hash=build_idempotency_hash(self.user.id, concurrent),
+                **concurrent
+            )
+            return bulk_create(objs, **kwargs)
+        
+        with mock.patch.object(Transaction.objects, 'bulk_create', side_effect=racing_bulk_create):
+            created = ingest_transactions(self.upload, self.rows, self.classifier)
+        
+        self.assertEqual(created, 4)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 5)
+        rollup = MonthlyRollup.objects.get(user=self.user)
+        self.assertEqual((rollup.total, rollup.count), (Decimal('50.00'), 5))
+
+
+class ProcessStatementUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.user = make_user()
+        content = (
+            b'Date,Description,Amount\n'
+            b'01/02/2024,"COFFEE\nSHOP",-4.50\n'
+            b'\n'
+            b'01/03/2024,GROCERY STORE,-20.00\n'
+            b'01/04/2024,,-1.00\n'
+        )
+        self.upload = StatementUpload.objects.create(
+            user=self.user, file=SimpleUploadedFile('statement.csv', content),
+            original_filename='statement.csv', file_type='csv', file_hash='0' * 64
+        )
+
+    def test_counts_records_without_parsing_them(self):
+        self.assertEqual(count_csv_records(self.upload.file.path), 3)
+
+    @mock.patch('transactions.tasks.detect_recurring_patterns.delay')
+    @mock.patch('ml_engine.registry.model_registry.get_classifier')
+    def test_csv_is_parsed_once(self, get_classifier, detect):
+        get_classifier.return_value = SimpleNamespace(is_loaded=False)
+        
+        with mock.patch('transactions.tasks.parse_csv_statement', wraps=parse_csv_statement) as parse:
+            process_statement_upload.run(str(self.upload.id))
+        
+        parse.assert_called_once()
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.status, 'completed')
+        self.assertEqual((self.upload.rows_total, self.upload.rows_processed), (2, 2))
+        self.assertEqual(self.upload.transactions_count, 2)
+
+    @mock.patch('transactions.tasks.count_csv_records')
+    @mock.patch('transactions.tasks.detect_recurring_patterns.delay')
+    @mock.patch('ml_engine.registry.model_registry.get_classifier')
+    def test_retry_does_not_recount(self, get_classifier, detect, count):
+        get_classifier.return_value = SimpleNamespace(is_loaded=False)
+        StatementUpload.objects.filter(pk=self.upload.pk).update(rows_total=3)
+        
+        process_statement_upload.run(str(self.upload.id))
+        
+        count.assert_not_called()
+
+    @mock.patch('transactions.tasks.detect_recurring_patterns.delay')
+    @mock.patch('ml_engine.registry.model_registry.get_classifier')
+    def test_pdf_total_is_known_before_ingesting(self, get_classifier, detect):
+        get_classifier.return_value = SimpleNamespace(is_loaded=False)
+        StatementUpload.objects.filter(pk=self.upload.pk).update(file_type='pdf')
+        rows = [
+            {'date': date(2024, 1, 2), 'description': 'COFFEE SHOP', 'amount': Decimal('-4.50')},
+            {'date': date(2024, 1, 3), 'description': 'GROCERY STORE', 'amount': Decimal('-20.00')},
+        ]
+        totals = []
+        
+        def ingest(upload, transactions_data, classifier):
+            totals.append(StatementUpload.objects.get(pk=upload.pk).rows_total)
+            return 0
+        
+        with mock.patch('transactions.tasks.parse_pdf_statement', return_value=iter(rows)), \
+                mock.patch('transactions.tasks.ingest_transactions', side_effect=ingest):
+            process_statement_upload.run(str(self.upload.id))
+        
+        self.assertEqual(totals, [2])
+
+
+class DateParserTests(TestCase):
+    samples = [
+        '01/02/2024', '1/2/2024', '12/31/99', '01/02/68', '01/02/69', '2024-02-29',
+        '2023-02-29', '25/01/2024', '13/13/2024', 'Jan 05, 2024', 'January 5, 2024',
+        '05-01-2024', '2024/01/05', '2024-1-5', '', 'not a date', '01/02/2024 extra',
+    ]
+
+    def strptime(self, fmt, date_str):
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            return None
+
+    def test_compiled_formats_agree_with_strptime(self):
+        for fmt in DATE_FORMATS:
+            for date_str in self.samples:
+                with self.subTest(fmt=fmt, date_str=date_str):
+                    self.assertEqual(compile_date_format(fmt)(date_str), self.strptime(fmt, date_str))
+
+    def test_ambiguous_rows_settle_on_day_first(self):
+        parser = DateParser()
+        
+        self.assertEqual(parser.parse('01/02/2024'), date(2024, 1, 2))
+        self.assertIsNone(parser.format)
+        self.assertEqual(parser.parse('25/01/2024'), date(2024, 1, 25))
+        self.assertEqual(parser.format, '%d/%m/%Y')
+        self.assertEqual(parser.parse('03/04/2024'), date(2024, 4, 3))
+
+    def test_locks_after_sample_size_rows(self):
+        parser = DateParser(sample_size=2)
+        
+        parser.parse('01/02/2024')
+        self.assertIsNone(parser.format)
+        parser.parse('03/04/2024')
+        self.assertEqual(parser.format, '%m/%d/%Y')
+
+    def test_rows_sampled_before_a_day_first_row_are_reparsed(self):
+        content = (
+            'Date,Description,Amount\n'
+            '01/02/2024,COFFEE SHOP,-4.50\n'
+            '02/03/2024,GROCERY STORE,-20.00\n'
+            '25/01/2024,PAYROLL,1000.00\n'
+            '03/04/2024,BOOK SHOP,-12.00\n'
+        )
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        
+        rows = list(parse_csv_statement(f.name))
+        
+        self.assertEqual([row['date'] for row in rows], [
+            date(2024, 2, 1), date(2024, 3, 2), date(2024, 1, 25), date(2024, 4, 3),
+        ])
+
+    def test_resolve_decides_undecided_statements_at_the_end(self):
+        parser = DateParser()
+        records = [(s, {'date': parser.parse(s)}) for s in ['01/02/2024', '03/04/2024']]
+        
+        rows = list(parser.resolve(iter(records)))
+        
+        self.assertEqual(parser.format, '%m/%d/%Y')
+        self.assertEqual([row['date'] for row in rows], [date(2024, 1, 2), date(2024, 3, 4)])
+
+    def test_rows_in_another_format_fall_back_after_locking(self):
+        parser = DateParser()
+        parser.parse('2024-01-05')
+        
+        self.assertEqual(parser.format, '%Y-%m-%d')
+        self.assertEqual(parser.parse(' Jan 07, 2024 '), date(2024, 1, 7))
+        self.assertIsNone(parser.parse('not a date'))
+
+
+def _extract_pdf_in_daemon(file_path, results):
+    results.put(_extract_pdf_text_parallel(file_path, 4, 2))
+
+
+@override_settings(STATEMENT_PDF_PARALLEL_MIN_PAGES=2)
+class ParsePdfStatementTests(TestCase):
+    def setUp(self):
+        from reportlab.pdfgen import canvas
+        
+        fd, self.path = tempfile.mkstemp(suffix='.pdf')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        
+        pdf = canvas.Canvas(self.path)
+        for day in range(1, 5):
+            pdf.drawString(72, 720, f'{day:02d}/02/2024 COFFEE SHOP 4.50')
+            pdf.showPage()
+        pdf.save()
+
+    def test_parallel_extraction_matches_serial(self):
+        serial = list(parse_pdf_statement(self.path, workers=1))
+        parallel = list(parse_pdf_statement(self.path, workers=2))
+        
+        self.assertEqual(parallel, serial)
+        self.assertEqual([row['date'] for row in parallel], [date(2024, day, 2) for day in range(1, 5)])
+
+    def test_parallel_extraction_runs_inside_daemonic_worker(self):
+        # Prefork Celery children are daemonic, like this process
+        results = multiprocessing.Queue()
+        worker = multiprocessing.Process(target=_extract_pdf_in_daemon, args=(self.path, results), daemon=True)
+        worker.start()
+        page_texts = results.get(timeout=60)
+        worker.join()
+        
+        self.assertIsNotNone(page_texts)
+        self.assertEqual(len(page_texts), 4)
+        self.assertIn('COFFEE SHOP', page_texts[0])
@@ -1,5 +1,6 @@
 import hashlib
-from django.db.models import Sum, Count, Q
+from django.db import transaction as db_transaction
+from django.db.models import Q
 from django.utils import timezone
 from rest_framework import generics, status, views
 from rest_framework.response import Response
@@ -8,6 +9,8 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
 from .models import Category, Transaction, StatementUpload, RecurringPattern
+from .aggregation import summarize_transactions
+from .rollups import recategorize_rollups
 from .serializers import (
     CategorySerializer, TransactionSerializer, TransactionCreateSerializer,
     TransactionBulkUpdateSerializer, StatementUploadSerializer,
@@ -118,7 +121,10 @@ class TransactionBulkUpdateView(views.APIView):
         if 'notes' in serializer.validated_data:
             update_fields['notes'] = serializer.validated_data['notes']
         
-        updated_count = transactions.update(**update_fields)
+        with db_transaction.atomic():
+            if 'category_id' in update_fields:
+                recategorize_rollups(transactions, update_fields['category_id'])
+            updated_count = transactions.update(**update_fields)
         
         return Response({
             'message': f'Updated {updated_count} transactions',
@@ -137,40 +143,30 @@ class TransactionSummaryView(views.APIView):
         ]
     )
     def get(self, request):
-        queryset = Transaction.objects.filter(user=request.user)
-        
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        
-        if start_date:
-            queryset = queryset.filter(date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(date__lte=end_date)
-        
-        total_income = queryset.filter(
-            transaction_type='credit'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        total_expenses = queryset.filter(
-            transaction_type='debit'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        by_category = queryset.filter(
-            transaction_type='debit', category__isnull=False
-        ).values('category__name', 'category__color').annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('-total')
+        summary = summarize_transactions(
+            request.user,
+            start_date=request.query_params.get('start_date'),
+            end_date=request.query_params.get('end_date')
+        )
         
         return Response({
-            'total_income': total_income,
-            'total_expenses': total_expenses,
-            'net': total_income - total_expenses,
-            'by_category': list(by_category),
-            'transaction_count': queryset.count()
+            'total_income': summary['income'],
+            'total_expenses': summary['expenses'],
+            'net': summary['income'] - summary['expenses'],
+            'by_category': summary['by_category'],
+            'transaction_count': summary['count']
         })
 
 
+def hash_uploaded_file(uploaded_file):
+    """SHA-256 of an upload, read chunk by chunk so it is never fully in memory"""
+    sha256 = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        sha256.update(chunk)
+    uploaded_file.seek(0)
+    return sha256.hexdigest()
+
+
 class StatementUploadView(generics.CreateAPIView):
     serializer_class = StatementUploadSerializer
     permission_classes = [IsAuthenticated]
@@ -196,9 +192,7 @@ class StatementUploadView(generics.CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        file_content = file.read()
-        file_hash = hashlib.sha256(file_content).hexdigest()
-        file.seek(0)
+        file_hash = hash_uploaded_file(file)
         
         existing = StatementUpload.objects.filter(
             user=request.user, file_hash=file_hash